@@ -1,5 +1,6 @@
 import pygame
 import sys
+from textcache import TextRenderer
 
 # Initialize Pygame
 pygame.init()
@@ -27,6 +28,7 @@ PINK = (255, 192, 203)
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Mario Forever CE")
 clock = pygame.time.Clock()
+hud_text = TextRenderer()
 
 class Player:
     def __init__(self):
@@ -194,9 +196,8 @@ while True:
         pygame.draw.rect(screen, color, enemy.rect.move(-camera_x, 0), 0, 3)
     
     # UI
-    font = pygame.font.Font(None, 36)
-    text = font.render(f"Score: {score} Lives: {lives}", True, (0, 0, 0))
-    screen.blit(text, (10 - camera_x, 10))
+    x = hud_text.draw_number(screen, "Score: ", score, 36, (0, 0, 0), (10 - camera_x, 10))
+    hud_text.draw_number(screen, " Lives: ", lives, 36, (0, 0, 0), (x, 10))
     
     pygame.display.flip()
     clock.tick(FPS)
@@ -2,8 +2,11 @@ import pygame
 import random
 import math
 import sys
-import noise
+import numpy as np
+from array import array
+from bisect import bisect_left, bisect_right
 from pygame.math import Vector2
+from levelcache import LevelCache
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
@@ -13,13 +16,86 @@ WORLD_COUNT = 8
 LEVELS_PER_WORLD = 5
 
 # Procedural generation parameters
-SEED = random.randint(0, 999999)
 OCTAVES = 6
 PERSISTENCE = 0.7
 LACUNARITY = 2.3
+TERRAIN_STEP = 50  # Pixels between heightmap samples
+
+# Runtime parameters
+GRAVITY = 0.6
+JUMP_FORCE = -12
+PLAYER_SPEED = 5
+PLAYER_SIZE = (24, 32)
+ENEMY_SIZE = (32, 32)
+ENEMY_SPEED = 1.5
+PLATFORM_HEIGHT = 16
+MAX_STEP = 32  # Tallest terrain step a walker can climb
+CHUNK_WIDTH = 512  # Width of one pre-rendered terrain chunk
+GENERATOR_VERSION = 1  # Bump whenever generated level content changes
+
+# Packed level layout: (terrain heights, platforms, enemies, collectibles) int32 records
+ENEMY_TYPES = ('goomba', 'koopa', 'plant', 'cheep', 'bowser')
+LEVEL_CACHE = LevelCache("smb3", GENERATOR_VERSION, (1, 3, 3, 2))
+
+# Ken Perlin's reference permutation, doubled as in the noise library so (i & 255) + base stays in range
+PERM = np.tile(np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+    36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+    234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+    88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+    134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+    230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+    1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+    116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+    124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+    154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19,
+    98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228,
+    251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235,
+    249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176,
+    115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29,
+    24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180
+], dtype=np.int32), 2)
+
+def perlin_noise1(x, octaves=1, persistence=0.5, lacunarity=2.0, repeat=1024, base=0):
+    """Array version of noise.pnoise1, matching its float32 arithmetic sample for sample, negative x included"""
+    x = np.asarray(x, dtype=np.float32)
+    freq = np.float32(1.0)
+    amp = np.float32(1.0)
+    total = np.zeros_like(x)
+    max_amp = np.float32(0.0)
+    for _ in range(octaves):
+        xf = x * freq
+        floor = np.floor(xf)
+        # C's % truncates toward zero, so negative cells wrap to negative indices
+        # and rely on & 255 below, exactly as in the noise library's noise1
+        period = int(repeat * freq)
+        i = np.fmod(floor.astype(np.int64), period)
+        ii = np.fmod(i + 1, period)
+        t = xf - floor
+        fade = t * t * t * (t * (t * np.float32(6) - np.float32(15)) + np.float32(10))
+        # Gradient slope is (hash & 7) + 1, or -1 when bit 3 is set
+        g0 = PERM[(i & 255) + base]
+        g1 = PERM[(ii & 255) + base]
+        grad0 = np.where(g0 & 8, np.float32(-1), (g0 & 7) + np.float32(1)).astype(np.float32) * t
+        grad1 = np.where(g1 & 8, np.float32(-1), (g1 & 7) + np.float32(1)).astype(np.float32) * (t - np.float32(1))
+        total += (grad0 + fade * (grad1 - grad0)) * np.float32(0.4) * amp
+        max_amp += amp
+        freq *= np.float32(lacunarity)
+        amp *= np.float32(persistence)
+    return total / max_amp
+
+def terrain_heightmaps(seed, worlds, level_length):
+    """Terrain heights for one or more worlds as a (len(worlds), columns) int32 array"""
+    xs = np.arange(0, level_length, TERRAIN_STEP)
+    nx = (seed + xs / 500.0)[None, :] + np.asarray(worlds, dtype=np.float64)[:, None]
+    heights = perlin_noise1(nx, OCTAVES, PERSISTENCE, LACUNARITY).astype(np.float64)
+    return (SCREEN_HEIGHT - 150 + (heights * 100).astype(np.int32)).astype(np.int32)
 
 class SMB3Generator:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # A fresh world every launch; --seed N replays one, warm from the level cache
+        self.seed = seed if seed is not None else random.randint(0, 999999)
         self.patterns = {
             'ground': self.generate_ground_pattern,
             'underground': self.generate_underground_pattern,
@@ -39,43 +115,65 @@ class SMB3Generator:
         for lvl in range(LEVELS_PER_WORLD):
             level_type = 'boss' if lvl == LEVELS_PER_WORLD-1 else 'normal'
             world_data['levels'].append(
-                self.generate_level(world_num, lvl+1, world_data['theme'], level_type))
+                self.load_level(world_num, lvl+1, world_data['theme'], level_type))
         
         return world_data
 
+    def load_level(self, world, level, theme, level_type):
+        """Fetch level data from the on-disk cache, generating it on a miss"""
+        packed = LEVEL_CACHE.get_or_generate(
+            self.seed, world, level,
+            lambda: self.pack_level(self.generate_level(world, level, theme, level_type)))
+        return self.unpack_level(packed)
+
+    def pack_level(self, level_data):
+        """Flatten level data into int32 record arrays"""
+        terrain = level_data['terrain']
+        platforms = array('i', [v for plat in level_data['platforms'] for v in plat])
+        enemies = array('i')
+        for x, y, enemy_type in level_data['enemies']:
+            enemies.extend((round(x), round(y), ENEMY_TYPES.index(enemy_type)))
+        collectibles = array('i', [v for item in level_data['collectibles'] for v in item])
+        return terrain, platforms, enemies, collectibles
+
+    def unpack_level(self, packed):
+        """Rebuild level data tuples from packed records"""
+        terrain, platforms, enemies, collectibles = packed
+        return {
+            'terrain': np.frombuffer(terrain, dtype=np.int32),
+            'platforms': list(zip(platforms[0::3], platforms[1::3], platforms[2::3])),
+            'enemies': [(x, y, ENEMY_TYPES[t]) for x, y, t in
+                        zip(enemies[0::3], enemies[1::3], enemies[2::3])],
+            'collectibles': list(zip(collectibles[0::2], collectibles[1::2]))
+        }
+
     def generate_level(self, world, level, theme, level_type):
         """Procedurally generate level geometry using layered noise algorithms"""
         level_length = 1500 + (world * 300) + (level * 150)
-        height_map = []
+        # Seeded per level so cached content always matches a fresh generation
+        rng = random.Random(f"{self.seed}:{world}:{level}")
         platform_map = []
         
-        # Generate base terrain using Perlin noise
-        for x in range(0, level_length, 50):
-            nx = SEED + x/500.0
-            height = noise.pnoise1(nx + world, 
-                                 octaves=OCTAVES,
-                                 persistence=PERSISTENCE,
-                                 lacunarity=LACUNARITY)
-            height = SCREEN_HEIGHT - 150 + int(height * 100)
-            height_map.append((x, height))
+        # Generate base terrain using Perlin noise; column i sits at x = i * TERRAIN_STEP
+        height_map = terrain_heightmaps(self.seed, [world], level_length)[0]
         
         # Add platform patterns
         platform_spacing = 200 - (world * 10)
         platform_y = SCREEN_HEIGHT - 250
         for x in range(300, level_length-300, platform_spacing):
-            length = 100 + random.randint(-50, 100)
+            length = 100 + rng.randint(-50, 100)
             platform_map.append((x, platform_y, length))
-            platform_y -= 50 if random.random() < 0.3 else 0
+            platform_y -= 50 if rng.random() < 0.3 else 0
             platform_y = max(200, min(SCREEN_HEIGHT-200, platform_y))
         
         return {
             'terrain': height_map,
             'platforms': platform_map,
-            'enemies': self.generate_enemy_layout(world, level_type),
-            'collectibles': self.generate_collectible_pattern()
+            'enemies': self.generate_enemy_layout(world, level_type, rng),
+            'collectibles': self.generate_collectible_pattern(level_length, rng)
         }
 
-    def generate_enemy_layout(self, world, level_type):
+    def generate_enemy_layout(self, world, level_type, rng):
         """Generate enemy patterns using mathematical distributions"""
         enemy_types = ['goomba', 'koopa', 'plant', 'cheep'][:1 + (world//2)]
         pattern = []
@@ -83,9 +181,9 @@ class SMB3Generator:
         # Normal distribution for enemy placement
         num_enemies = 10 + (world * 3)
         for _ in range(num_enemies):
-            x = random.gauss(LEVEL_WIDTH/2, LEVEL_WIDTH/4)
+            x = rng.gauss(LEVEL_WIDTH/2, LEVEL_WIDTH/4)
             y = SCREEN_HEIGHT - 200
-            enemy_type = random.choice(enemy_types)
+            enemy_type = rng.choice(enemy_types)
             pattern.append((x, y, enemy_type))
         
         if level_type == 'boss':
@@ -93,22 +191,135 @@ class SMB3Generator:
         
         return pattern
 
-    # Additional pattern generators omitted for brevity...
+    def generate_collectible_pattern(self, level_length, rng):
+        """Scatter coin rows above the terrain"""
+        coins = []
+        for x in range(400, level_length - 200, 400):
+            y = rng.randint(200, SCREEN_HEIGHT - 250)
+            coins.extend((x + i * 24, y) for i in range(3))
+        return coins
+
+    def generate_enemy_pattern(self, world_num):
+        """Per-world enemy behaviour parameters"""
+        return {'speed': ENEMY_SPEED + world_num * 0.25}
+
+    def generate_ground_pattern(self):
+        return {'sky': (104, 136, 252), 'ground': (0, 168, 0), 'platform': (252, 152, 56)}
+
+    def generate_underground_pattern(self):
+        return {'sky': (0, 0, 0), 'ground': (0, 112, 136), 'platform': (60, 188, 252)}
+
+    def generate_sky_pattern(self):
+        return {'sky': (164, 228, 252), 'ground': (252, 252, 252), 'platform': (252, 216, 168)}
+
+    def generate_water_pattern(self):
+        return {'sky': (32, 56, 236), 'ground': (0, 136, 136), 'platform': (184, 248, 216)}
+
+class Enemy:
+    """Pooled enemy entity, re-armed by load_level instead of reallocated"""
+    __slots__ = ('kind', 'rect', 'direction', 'speed', 'alive')
 
-class SMB3Runtime:
     def __init__(self):
+        self.kind = None
+        self.rect = pygame.Rect((0, 0), ENEMY_SIZE)
+        self.direction = -1
+        self.speed = 0
+        self.alive = False
+
+    def spawn(self, x, bottom, kind, speed):
+        self.kind = kind
+        self.rect.x = x
+        self.rect.bottom = bottom
+        self.direction = -1
+        self.speed = speed
+        self.alive = True
+
+class SMB3Runtime:
+    def __init__(self, seed=None):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.clock = pygame.time.Clock()
-        self.generator = SMB3Generator()
+        self.generator = SMB3Generator(seed)
         self.current_world = self.generator.generate_world(1)
         self.current_level = 0
+        self.enemy_pool = []
+        self.player = pygame.Rect((0, 0), PLAYER_SIZE)
+        self.velocity = Vector2(0, 0)
+        self.on_ground = False
+        self.camera_x = 0.0
+        self.load_level(self.current_world['levels'][self.current_level])
         
     def load_level(self, level_data):
         """Convert procedural data to runtime objects"""
-        # Convert platform data to collision objects
-        # Convert enemy patterns to AI entities
-        # Generate visual representation through mathematical shapes
+        palette = self.generator.patterns[self.current_world['theme']]()
+        heights = np.asarray(level_data['terrain'], dtype=np.int32)
+        self.level_length = len(heights) * TERRAIN_STEP
+        
+        # Merge runs of equal-height columns into collision spans
+        breaks = np.flatnonzero(np.diff(heights)) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(heights)]))
+        self.span_lefts = (starts * TERRAIN_STEP).tolist()
+        self.span_rights = (ends * TERRAIN_STEP).tolist()
+        self.span_tops = heights[starts].tolist()
+        
+        # Platforms become one AABB array sorted by left edge
+        boxes = sorted((x, y, length, PLATFORM_HEIGHT) for x, y, length in level_data['platforms'])
+        self.platforms = [pygame.Rect(box) for box in boxes]
+        self.platform_lefts = [box[0] for box in boxes]
+        self.platform_max_width = max((box[2] for box in boxes), default=0)
+        
+        # Enemies come out of a pool that only grows when a level needs more
+        speed = self.current_world['enemy_pattern']['speed']
+        layout = level_data['enemies']
+        while len(self.enemy_pool) < len(layout):
+            self.enemy_pool.append(Enemy())
+        self.enemies = self.enemy_pool[:len(layout)]
+        for enemy, (x, y, kind) in zip(self.enemies, layout):
+            x = min(max(int(x), 0), self.level_length - ENEMY_SIZE[0])
+            enemy.spawn(x, self.ground_top(x, x + ENEMY_SIZE[0]), kind, speed)
+        for enemy in self.enemy_pool[len(layout):]:
+            enemy.alive = False
+        
+        self.coins = [pygame.Rect(x, y, 16, 16) for x, y in level_data['collectibles']]
+        self.chunks = self.bake_chunks(palette)
+        self.reset_player()
+
+    def bake_chunks(self, palette):
+        """Pre-render sky, terrain and platforms into fixed-width chunk surfaces"""
+        chunks = []
+        for left in range(0, self.level_length, CHUNK_WIDTH):
+            right = min(left + CHUNK_WIDTH, self.level_length)
+            chunk = pygame.Surface((right - left, SCREEN_HEIGHT))
+            chunk.fill(palette['sky'])
+            first = bisect_right(self.span_lefts, left) - 1
+            last = bisect_left(self.span_lefts, right)
+            for i in range(max(first, 0), last):
+                pygame.draw.rect(chunk, palette['ground'], (
+                    self.span_lefts[i] - left, self.span_tops[i],
+                    self.span_rights[i] - self.span_lefts[i], SCREEN_HEIGHT - self.span_tops[i]))
+            for plat in self.nearby_platforms(left, right):
+                pygame.draw.rect(chunk, palette['platform'], plat.move(-left, 0))
+            chunks.append(chunk.convert() if pygame.display.get_surface() else chunk)
+        return chunks
+
+    def ground_top(self, left, right):
+        """Highest terrain surface under the x range [left, right)"""
+        first = max(bisect_right(self.span_lefts, left) - 1, 0)
+        last = bisect_left(self.span_lefts, right)
+        return min(self.span_tops[first:max(last, first + 1)])
+
+    def nearby_platforms(self, left, right):
+        lo = bisect_left(self.platform_lefts, left - self.platform_max_width)
+        hi = bisect_left(self.platform_lefts, right)
+        return [plat for plat in self.platforms[lo:hi] if plat.right > left]
+
+    def reset_player(self):
+        self.player.x = 100
+        self.player.bottom = self.ground_top(self.player.left, self.player.right)
+        self.velocity.update(0, 0)
+        self.on_ground = True
+        self.camera_x = 0.0
         
     def run(self):
         while True:
@@ -116,21 +327,108 @@ class SMB3Runtime:
             self.update()
             self.render()
             self.clock.tick(FPS)
+
+    def handle_input(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE and self.on_ground:
+                self.velocity.y = JUMP_FORCE
+                self.on_ground = False
+        
+        keys = pygame.key.get_pressed()
+        self.velocity.x = PLAYER_SPEED * (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT])
             
     def update(self):
         """Update game state with physics and AI"""
-        # Collision detection using vector math
-        # Entity behavior through state machines
+        self.update_player()
+        self.update_enemies()
+        
+        # Coin pickup
+        self.coins = [coin for coin in self.coins if not coin.colliderect(self.player)]
+        
         # Camera control via smooth interpolation
+        target = min(max(self.player.centerx - SCREEN_WIDTH // 2, 0), self.level_length - SCREEN_WIDTH)
+        self.camera_x += (target - self.camera_x) * 0.1
+        
+        if self.player.right >= self.level_length - TERRAIN_STEP:
+            self.current_level = (self.current_level + 1) % LEVELS_PER_WORLD
+            self.load_level(self.current_world['levels'][self.current_level])
+
+    def update_player(self):
+        player = self.player
+        self.velocity.y = min(self.velocity.y + GRAVITY, 12)
+        
+        # Horizontal: walk up small steps, stop at taller terrain
+        if self.velocity.x:
+            old_x = player.x
+            player.x = min(max(player.x + int(self.velocity.x), 0), self.level_length - player.width)
+            ground = self.ground_top(player.left, player.right)
+            if ground < player.bottom - MAX_STEP:
+                player.x = old_x
+            elif self.on_ground and ground < player.bottom:
+                player.bottom = ground
+        
+        # Vertical: terrain spans first, then one-way platforms when falling
+        old_bottom = player.bottom
+        player.y += int(self.velocity.y)
+        self.on_ground = False
+        ground = self.ground_top(player.left, player.right)
+        if player.bottom >= ground:
+            player.bottom = ground
+            self.velocity.y = 0
+            self.on_ground = True
+        elif self.velocity.y > 0:
+            for plat in self.nearby_platforms(player.left, player.right):
+                if old_bottom <= plat.top <= player.bottom:
+                    player.bottom = plat.top
+                    self.velocity.y = 0
+                    self.on_ground = True
+                    break
+
+    def update_enemies(self):
+        for enemy in self.enemies:
+            if not enemy.alive:
+                continue
+            rect = enemy.rect
+            rect.x += round(enemy.speed * enemy.direction)
+            ground = self.ground_top(rect.left, rect.right)
+            if rect.left < 0 or rect.right > self.level_length or ground < rect.bottom - MAX_STEP:
+                enemy.direction *= -1
+                rect.x += round(enemy.speed * enemy.direction)
+            else:
+                rect.bottom = ground
+            
+            if rect.colliderect(self.player):
+                if self.velocity.y > 0 and self.player.bottom <= rect.centery:
+                    enemy.alive = False
+                    self.velocity.y = JUMP_FORCE * 0.5
+                else:
+                    self.reset_player()
         
     def render(self):
         """Render generated content using mathematical primitives"""
-        # Draw parametric platforms
-        # Generate enemy sprites through shape combinations
-        # Create visual effects using trigonometry
+        camera_x = int(self.camera_x)
+        first = camera_x // CHUNK_WIDTH
+        last = min((camera_x + SCREEN_WIDTH) // CHUNK_WIDTH, len(self.chunks) - 1)
+        self.screen.blits([
+            (self.chunks[i], (i * CHUNK_WIDTH - camera_x, 0)) for i in range(first, last + 1)
+        ], doreturn=False)
+        
+        view_right = camera_x + SCREEN_WIDTH
+        for coin in self.coins:
+            if camera_x - coin.width < coin.x < view_right:
+                pygame.draw.circle(self.screen, (252, 216, 0), (coin.centerx - camera_x, coin.centery), 8)
+        for enemy in self.enemies:
+            if enemy.alive and camera_x - enemy.rect.width < enemy.rect.x < view_right:
+                color = (200, 40, 40) if enemy.kind == 'bowser' else (172, 80, 56)
+                pygame.draw.ellipse(self.screen, color, enemy.rect.move(-camera_x, 0))
+        pygame.draw.rect(self.screen, (228, 52, 52), self.player.move(-camera_x, 0))
         
-    # Core game loop implementation omitted for space
+        pygame.display.flip()
 
 if __name__ == "__main__":
-    game = SMB3Runtime()
+    seed = int(sys.argv[2]) if len(sys.argv) == 3 and sys.argv[1] == "--seed" else None
+    game = SMB3Runtime(seed)
     game.run()
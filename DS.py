@@ -1,5 +1,6 @@
 import pygame
 import sys
+from headless import HeldKeys
 
 # Constants
 NES_WIDTH, NES_HEIGHT = 256, 240
@@ -33,9 +34,8 @@ class Player(Entity):
         self.on_ground = False
         self.coyote_time = 0
 
-    def update(self, dt, platforms):
+    def update(self, dt, platforms, keys):
         self.velocity.x = 0
-        keys = pygame.key.get_pressed()
         
         if keys[pygame.K_LEFT]: self.velocity.x = -PLAYER_SPEED
         if keys[pygame.K_RIGHT]: self.velocity.x = PLAYER_SPEED
@@ -110,6 +110,7 @@ class Game:
         
         self.load_level()
         self.camera_x = 0
+        self.held_keys = HeldKeys()
 
     def load_level(self):
         # Ground
@@ -132,17 +133,22 @@ class Game:
         while True:
             dt = self.clock.tick(60) / 1000
             self.handle_input()
-            self.update(dt)
+            self.update(dt, pygame.key.get_pressed())
             self.draw()
-            
+
+    def step(self, inputs=(), dt=1/60):
+        """Advance one tick with the given keys held, without drawing."""
+        self.held_keys = HeldKeys(inputs, self.held_keys)
+        self.update(dt, self.held_keys)
+
     def handle_input(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
 
-    def update(self, dt):
-        self.player.update(dt, self.platforms)
+    def update(self, dt, keys):
+        self.player.update(dt, self.platforms, keys)
         self.enemies.update(dt, self.platforms)
         
         # Enemy collision
@@ -2,6 +2,7 @@ import pygame
 import sys
 import math
 from pygame.math import Vector2
+from textcache import TextRenderer
 
 # Constants
 SCREEN_WIDTH = 800
@@ -92,6 +93,7 @@ class Game:
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.clock = pygame.time.Clock()
+        self.hud_text = TextRenderer()
         self.reset_level()
         
     def reset_level(self):
@@ -167,11 +169,8 @@ class Game:
             self.screen.blit(self.player.image, self.player.rect)
             
             # HUD
-            font = pygame.font.Font(None, 36)
-            score_text = font.render(f"Score: {self.player.score}", True, (255,255,255))
-            lives_text = font.render(f"Lives: {self.player.lives}", True, (255,255,255))
-            self.screen.blit(score_text, (10, 10))
-            self.screen.blit(lives_text, (10, 50))
+            self.hud_text.draw_number(self.screen, "Score: ", self.player.score, 36, (255,255,255), (10, 10))
+            self.hud_text.draw_number(self.screen, "Lives: ", self.player.lives, 36, (255,255,255), (10, 50))
             
             pygame.display.update()
             self.clock.tick(FPS)
@@ -1,9 +1,13 @@
 import pygame
 import random
-import array
 import asyncio
 import platform
 import math
+import numpy as np
+from textcache import TextRenderer
+from apu import APUStream, length_index, lfsr_sequence, pulse_timer
+from sfxbank import SFXBank, mixer_frames, square_samples
+from headless import HeldKeys
 
 # Initialize Pygame
 pygame.init()
@@ -37,51 +41,86 @@ class FamicomSoundEngine:
     def __init__(self):
         pygame.mixer.init(frequency=44100, size=-16, channels=2)
         pygame.mixer.set_num_channels(4)
-        self.sample_rate = 44100
-        
-        # Pre-generate common waveforms
-        self.square_wave = self.generate_square(523, 0.1)
-        self.noise_wave = self.generate_noise(0.1)
-        self.arpeggio_wave = self.generate_arpeggio()
+        self.sample_rate = pygame.mixer.get_init()[0]
+        self.bank = SFXBank()
+
+        # Stream effects from the APU model; the browser build has no threads, so it plays baked buffers
+        self.apu = None if platform.system() == "Emscripten" else APUStream().start()
+        if self.apu is None:
+            self.square_wave = self.generate_square(523, 0.1)
+            self.noise_wave = self.generate_noise(0.1)
+            self.arpeggio_wave = self.generate_arpeggio()
+        else:
+            self.apu.write(0x4015, 0x0F)
 
     def generate_square(self, freq, duration, duty=0.5):
-        samples = int(self.sample_rate * duration)
-        wave = array.array('h')
-        period = self.sample_rate / freq
-        high_samples = int(period * duty)
-        
-        for i in range(samples):
-            value = 32767 if (i % period) < high_samples else -32767
-            wave.append(int(value * 0.2))  # 20% volume for authenticity
-        return pygame.mixer.Sound(buffer=wave)
+        return self.bank.square(freq, duration, duty)
 
     def generate_noise(self, duration):
-        samples = int(self.sample_rate * duration)
-        wave = array.array('h')
-        for _ in range(samples):
-            val = random.randint(-32767, 32767) * 0.1  # 10% volume
-            wave.append(int(val))
-        return pygame.mixer.Sound(buffer=wave)
+        return self.bank.sound(("lfsr-noise", duration, 0.1),
+                               lambda: mixer_frames(self.noise_samples(duration)))
 
     def generate_arpeggio(self):
-        wave = array.array('h')
-        for freq in [523, 659, 784]:  # C5, E5, G5
-            period = self.sample_rate / freq
-            for i in range(int(self.sample_rate * 0.05)):
-                val = 32767 if (i % period) < (period/2) else -32767
-                wave.append(int(val * 0.15))
-        return pygame.mixer.Sound(buffer=wave)
+        # C5, E5, G5 played back to back
+        notes = lambda: square_samples([523, 659, 784], 0.05, volume=0.15).reshape(-1)
+        return self.bank.sound(("arpeggio", (523, 659, 784), 0.05, 0.5, 0.15),
+                               lambda: mixer_frames(notes()))
+
+    def noise_samples(self, duration, volume=0.1):
+        """NES-style noise: the 15-bit LFSR output, one shift per sample."""
+        samples = int(self.sample_rate * duration)
+        bits = np.resize(lfsr_sequence(), samples)
+        level = int(32767 * volume)
+        return np.where(bits, -level, level).astype(np.int16)
+
+    def play_pulse(self, base, freq, half_frames, duty=2, volume=8, delay=0.0):
+        # Constant volume, sweep off (negate set so low notes aren't muted), then timer and length
+        timer = pulse_timer(freq)
+        for offset, value in enumerate(((duty << 6) | 0x10 | volume, 0x08, timer & 0xFF,
+                                        (length_index(half_frames) << 3) | (timer >> 8))):
+            self.apu.write(base + offset, value, delay)
+
+    def play_bounce(self):
+        if self.apu is None:
+            self.square_wave.play()
+            return
+        self.play_pulse(0x4000, 523, 12)
 
+    def play_score(self):
+        if self.apu is None:
+            self.arpeggio_wave.play()
+            return
+        # C5, E5, G5 on the second pulse so a bounce can't cut the arpeggio off
+        for i, freq in enumerate((523, 659, 784)):
+            self.play_pulse(0x4004, freq, 6, volume=6, delay=0.05 * i)
+
+    def play_wall(self):
+        if self.apu is None:
+            self.noise_wave.play()
+            return
+        self.apu.write(0x400C, 0x10 | 4)
+        self.apu.write(0x400E, 0x03)
+        self.apu.write(0x400F, length_index(12) << 3)
+
+    def close(self):
+        if self.apu is not None:
+            self.apu.stop()
+
+class SilentSoundEngine:
+    # Stands in until main() opens the mixer, so importing the module or calling step() stays silent
     def play_bounce(self):
-        self.square_wave.play()
+        pass
 
     def play_score(self):
-        self.arpeggio_wave.play()
+        pass
 
     def play_wall(self):
-        self.noise_wave.play()
+        pass
 
-sound_engine = FamicomSoundEngine()
+    def close(self):
+        pass
+
+sound_engine = SilentSoundEngine()
 
 def reset_ball():
     global ball_speed_x, ball_speed_y
@@ -89,17 +128,64 @@ def reset_ball():
     ball_speed_x = 5 * random.choice([-1, 1])
     ball_speed_y = 5 * random.choice([-1, 1])
 
+reset_ball()
+held_keys = HeldKeys()
+
+def update(keys):
+    global score1, score2, ball_speed_x, ball_speed_y
+    # Move paddles
+    if keys[pygame.K_w] and paddle1.top > 0:
+        paddle1.y -= paddle_speed
+    if keys[pygame.K_s] and paddle1.bottom < HEIGHT:
+        paddle1.y += paddle_speed
+    if keys[pygame.K_UP] and paddle2.top > 0:
+        paddle2.y -= paddle_speed
+    if keys[pygame.K_DOWN] and paddle2.bottom < HEIGHT:
+        paddle2.y += paddle_speed
+
+    # Update ball position
+    ball.x += ball_speed_x
+    ball.y += ball_speed_y
+
+    # Wall collisions
+    if ball.top <= 0 or ball.bottom >= HEIGHT:
+        ball_speed_y *= -1
+        sound_engine.play_wall()
+
+    # Paddle collisions
+    if ball.colliderect(paddle1) and ball_speed_x < 0:
+        ball_speed_x *= -1
+        sound_engine.play_bounce()
+    elif ball.colliderect(paddle2) and ball_speed_x > 0:
+        ball_speed_x *= -1
+        sound_engine.play_bounce()
+
+    # Scoring
+    if ball.left <= 0:
+        score2 += 1
+        sound_engine.play_score()
+        reset_ball()
+    if ball.right >= WIDTH:
+        score1 += 1
+        sound_engine.play_score()
+        reset_ball()
+
+def step(inputs=()):
+    """Advance one tick with the given keys held, without drawing."""
+    global held_keys
+    held_keys = HeldKeys(inputs, held_keys)
+    update(held_keys)
+
 # Initialize font
 pygame.font.init()
-font = pygame.font.Font(pygame.font.get_default_font(), 24)
+hud_text = TextRenderer(pygame.font.get_default_font())
 
 async def main():
-    global score1, score2, ball_speed_x, ball_speed_y
+    global sound_engine
+    sound_engine = FamicomSoundEngine()
     clock = pygame.time.Clock()
     running = True
 
-    reset_ball()
-
     while running:
         dt = clock.tick(FPS)
 
@@ -107,43 +193,7 @@ async def main():
             if event.type == pygame.QUIT:
                 running = False
 
-        # Move paddles
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_w] and paddle1.top > 0:
-            paddle1.y -= paddle_speed
-        if keys[pygame.K_s] and paddle1.bottom < HEIGHT:
-            paddle1.y += paddle_speed
-        if keys[pygame.K_UP] and paddle2.top > 0:
-            paddle2.y -= paddle_speed
-        if keys[pygame.K_DOWN] and paddle2.bottom < HEIGHT:
-            paddle2.y += paddle_speed
-
-        # Update ball position
-        ball.x += ball_speed_x
-        ball.y += ball_speed_y
-
-        # Wall collisions
-        if ball.top <= 0 or ball.bottom >= HEIGHT:
-            ball_speed_y *= -1
-            sound_engine.play_wall()
-
-        # Paddle collisions
-        if ball.colliderect(paddle1) and ball_speed_x < 0:
-            ball_speed_x *= -1
-            sound_engine.play_bounce()
-        elif ball.colliderect(paddle2) and ball_speed_x > 0:
-            ball_speed_x *= -1
-            sound_engine.play_bounce()
-
-        # Scoring
-        if ball.left <= 0:
-            score2 += 1
-            sound_engine.play_score()
-            reset_ball()
-        if ball.right >= WIDTH:
-            score1 += 1
-            sound_engine.play_score()
-            reset_ball()
+        update(pygame.key.get_pressed())
 
         # Drawing
         win.fill(BLACK)
@@ -153,17 +203,20 @@ async def main():
         pygame.draw.aaline(win, WHITE, (WIDTH//2, 0), (WIDTH//2, HEIGHT))
         
         # Retro-style score display
-        score_text = font.render(f"{score1}   {score2}", True, WHITE)
-        win.blit(score_text, (WIDTH//2 - score_text.get_width()//2, 10))
+        score_width = hud_text.number_width("", score1, 24, WHITE) + hud_text.number_width("   ", score2, 24, WHITE)
+        x = hud_text.draw_number(win, "", score1, 24, WHITE, (WIDTH//2 - score_width//2, 10))
+        hud_text.draw_number(win, "   ", score2, 24, WHITE, (x, 10))
         
         pygame.display.flip()
         await asyncio.sleep(0)
 
     if platform.system() != "Emscripten":
+        sound_engine.close()
         pygame.quit()
 
 if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
+        sound_engine.close()
         pygame.quit()
@@ -1,5 +1,6 @@
 import pygame
 import sys
+from textcache import TextRenderer
 
 # Initialize Pygame
 pygame.init()
@@ -22,6 +23,7 @@ BROWN = (139, 69, 19)
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Mario Forever Remake")
 clock = pygame.time.Clock()
+hud_text = TextRenderer()
 
 # Player properties
 player = pygame.Rect(100, HEIGHT - 100, 40, 60)
@@ -122,9 +124,7 @@ while running:
         pygame.draw.rect(screen, BROWN, enemy['rect'])
     
     # Draw score
-    font = pygame.font.Font(None, 36)
-    text = font.render(f"Score: {score}", True, (0, 0, 0))
-    screen.blit(text, (10, 10))
+    hud_text.draw_number(screen, "Score: ", score, 36, (0, 0, 0), (10, 10))
 
     pygame.display.flip()
     clock.tick(FPS)
@@ -1,6 +1,7 @@
 import pygame
 import math
 from pygame.math import Vector2
+from headless import HeldKeys
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
@@ -63,6 +64,7 @@ class MarioLevel1_1:
         self.camera_x = 0
         self.flag_pos = Vector2(1800, SCREEN_HEIGHT-160)
         self.running = True
+        self.held_keys = HeldKeys()
 
     def run(self):
         while self.running:
@@ -72,16 +74,26 @@ class MarioLevel1_1:
             self.clock.tick(FPS)
         pygame.quit()
 
+    def step(self, inputs=()):
+        """Advance one tick with the given keys held, without drawing."""
+        self.held_keys = HeldKeys(inputs, self.held_keys)
+        self.apply_input(self.held_keys, self.held_keys.pressed)
+        self.update()
+
     def handle_input(self):
+        pressed = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and self.player["on_ground"]:
-                    self.player["vel"].y = JUMP_FORCE
-                    self.player["on_ground"] = False
+                pressed.append(event.key)
+        self.apply_input(pygame.key.get_pressed(), pressed)
+
+    def apply_input(self, keys, pressed):
+        if pygame.K_SPACE in pressed and self.player["on_ground"]:
+            self.player["vel"].y = JUMP_FORCE
+            self.player["on_ground"] = False
 
-        keys = pygame.key.get_pressed()
         self.player["vel"].x = 0
         if keys[pygame.K_LEFT]:
             self.player["vel"].x = -PLAYER_SPEED
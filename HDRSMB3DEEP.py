@@ -1,7 +1,14 @@
+import os
+import sys
+import time
+import hashlib
 import pygame
 import random
 import math
 from pygame.math import Vector2
+from textcache import TextRenderer
+from headless import HeldKeys
+from replay import Recording, replay
 
 # Constants
 SCREEN_WIDTH = 800
@@ -9,11 +16,12 @@ SCREEN_HEIGHT = 600
 GRAVITY = 0.6
 JUMP_HEIGHT = -13
 PLAYER_SPEED = 6
-ENEMY_SPASE = 2  # Base enemy speed
+ENEMY_BASE = 2  # Base enemy speed
 FPS = 60
 LEVEL_WIDTH = 3000
 WORLDS = 8
 LEVELS_PER_WORLD = 5
+REPLAY_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)  # Inputs a replay log records
 
 # Colors
 WHITE = (255, 255, 255)
@@ -28,9 +36,13 @@ ORANGE = (255, 165, 0)
 PURPLE = (128, 0, 128)
 SKY_BLUE = (135, 206, 235)
 
+# Replays run headless, so they never open a window
+if "--replay" in sys.argv:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
 pygame.init()
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 clock = pygame.time.Clock()
+hud_text = TextRenderer()
 
 class GameState:
     def __init__(self):
@@ -41,6 +53,7 @@ class GameState:
         self.lives = 3
         self.time = 400
         self.active = True
+        self.over = False
 
     def next_level(self):
         if self.level < LEVELS_PER_WORLD:
@@ -51,8 +64,8 @@ class GameState:
                 self.level = 1
             else:
                 print("You won the game!")
-                pygame.quit()
-                sys.exit()
+                self.over = True
+                return
         self.reset_level()
 
     def reset_level(self):
@@ -63,8 +76,8 @@ class GameState:
         self.lives -= 1
         if self.lives <= 0:
             print("Game Over!")
-            pygame.quit()
-            sys.exit()
+            self.over = True
+            return
         self.reset_level()
 
 class Camera:
@@ -166,7 +179,9 @@ class Coin(pygame.sprite.Sprite):
         self.angle = (self.angle + 5) % 360
         self.rect.y += math.sin(math.radians(self.angle)) * 0.5
 
-def generate_level(world, level):
+def generate_level(world, level, seed):
+    # Each level has its own stream, so the same seed always builds the same world
+    rng = random.Random(f"{seed}:{world}:{level}")
     platforms = pygame.sprite.Group()
     enemies = pygame.sprite.Group()
     coins = pygame.sprite.Group()
@@ -178,54 +193,54 @@ def generate_level(world, level):
     # Procedural platforms
     num_platforms = 15 + world * 2
     for _ in range(num_platforms):
-        x = random.randint(100, LEVEL_WIDTH-200)
-        y = random.randint(200, SCREEN_HEIGHT-200)
-        width = random.randint(80, 200)
+        x = rng.randint(100, LEVEL_WIDTH-200)
+        y = rng.randint(200, SCREEN_HEIGHT-200)
+        width = rng.randint(80, 200)
         height = 20
-        color = BROWN if random.random() < 0.3 else GREEN
+        color = BROWN if rng.random() < 0.3 else GREEN
         plat = Platform(x, y, width, height, color)
         platforms.add(plat)
 
         # Add enemies
-        if random.random() < 0.4:
+        if rng.random() < 0.4:
             enemies.add(Enemy(x + width//2, y - 40, world))
 
         # Add coins
-        if random.random() < 0.6:
+        if rng.random() < 0.6:
             coins.add(Coin(x + width//2, y - 60))
 
     return platforms, enemies, coins
 
 def draw_text(text, size, color, x, y):
-    font = pygame.font.Font(None, size)
-    surf = font.render(text, True, color)
-    screen.blit(surf, (x, y))
+    hud_text.draw(screen, text, size, color, (x, y))
+
+def draw_number(label, value, size, color, x, y):
+    hud_text.draw_number(screen, label, value, size, color, (x, y))
 
 # Game setup
-game = GameState()
-camera = Camera()
-player = Player()
+def new_game(game_seed):
+    global seed, game, camera, player, held_keys, platforms, enemies, coins
+    seed = game_seed
+    game = GameState()
+    camera = Camera()
+    player = Player()
+    held_keys = HeldKeys()
+    platforms, enemies, coins = generate_level(game.world, game.level, seed)
 
 def reset_game():
     global player
     player = Player()
     game.reset_level()
 
-# Main loop
-running = True
-platforms, enemies, coins = generate_level(game.world, game.level)
+new_game(random.randint(0, 999999))
 
-while running:
-    # Event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE and game.active:
-                player.jump()
+def tick(keys):
+    """Advance one tick of input and simulation; returns False once the game has ended."""
+    global platforms, enemies, coins
+    if pygame.K_SPACE in keys.pressed and game.active:
+        player.jump()
 
     # Player movement
-    keys = pygame.key.get_pressed()
     if game.active:
         player.vel.x = 0
         if keys[pygame.K_LEFT]:
@@ -251,10 +266,27 @@ while running:
         game.active = False
         game.score += 100 * game.time
         game.next_level()
-        platforms, enemies, coins = generate_level(game.world, game.level)
+        platforms, enemies, coins = generate_level(game.world, game.level, seed)
         player.rect.center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2)
-
-    # Drawing
+    return not game.over
+
+def step(inputs=()):
+    """Advance one tick with the given keys held, without drawing."""
+    global held_keys
+    held_keys = HeldKeys(inputs, held_keys)
+    return tick(held_keys)
+
+def state_digest():
+    """Hash of everything the simulation mutates, for checking replays."""
+    state = (
+        tuple(player.rect), tuple(player.vel), player.on_ground, player.direction,
+        game.world, game.level, game.score, game.coins, game.lives, game.time, game.active,
+        [(tuple(enemy.rect), enemy.direction) for enemy in enemies],
+        [tuple(coin.rect) for coin in coins],
+    )
+    return hashlib.sha1(repr(state).encode()).digest()
+
+def draw():
     screen.fill(SKY_BLUE)
     
     # Draw platforms
@@ -270,11 +302,51 @@ while running:
 
     # UI
     draw_text(f"World {game.world}-{game.level}", 40, WHITE, 10, 10)
-    draw_text(f"Coins: {game.coins}", 40, YELLOW, 10, 50)
-    draw_text(f"Lives: {game.lives}", 40, RED, SCREEN_WIDTH-200, 10)
-    draw_text(f"Time: {int(game.time)}", 40, WHITE, SCREEN_WIDTH-200, 50)
-
-    pygame.display.update()
-    clock.tick(FPS)
+    draw_number("Coins: ", game.coins, 40, YELLOW, 10, 50)
+    draw_number("Lives: ", game.lives, 40, RED, SCREEN_WIDTH-200, 10)
+    draw_number("Time: ", game.time, 40, WHITE, SCREEN_WIDTH-200, 50)
+
+def main(recording=None):
+    # Main loop
+    running = True
+    while running:
+        # Event handling
+        pressed = []
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN and event.key in REPLAY_KEYS:
+                pressed.append(event.key)
+
+        held = pygame.key.get_pressed()
+        keys = HeldKeys([key for key in REPLAY_KEYS if held[key]], pressed=pressed)
+        if recording is not None:
+            recording.record(keys)
+        if not tick(keys):
+            running = False
 
-pygame.quit()
+        # Drawing
+        draw()
+        pygame.display.update()
+        clock.tick(FPS)
+
+if __name__ == "__main__":
+    options = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+    if "--replay" in options:
+        # Headless re-run of a recorded session at full speed: --replay FILE
+        recording = Recording.load(options["--replay"], REPLAY_KEYS)
+        new_game(recording.seed)
+        start = time.perf_counter()
+        ticks, matched = replay(recording, tick, state_digest, "hdrsmb3deep")
+        print(f"Replayed {ticks} ticks in {time.perf_counter() - start:.2f}s: {'match' if matched else 'MISMATCH'}")
+        pygame.quit()
+        sys.exit(0 if matched else 1)
+    # Play, optionally with --seed N and --record FILE
+    if "--seed" in options:
+        new_game(int(options["--seed"]))
+    recording = Recording("hdrsmb3deep", seed, REPLAY_KEYS) if "--record" in options else None
+    main(recording)
+    if recording is not None:
+        recording.digest = state_digest()
+        recording.save(options["--record"])
+    pygame.quit()
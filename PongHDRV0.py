@@ -1,6 +1,8 @@
 import pygame
 import math
-import random
+from collections import deque
+from snakegrid import SnakeGrid
+from headless import HeldKeys
 
 # Initialize Pygame
 pygame.init()
@@ -17,8 +19,14 @@ RED = (255, 0, 0)
 # Snake Class
 class Snake:
     def __init__(self):
-        self.body = [(WIDTH // 2, HEIGHT // 2)]
+        self.body = deque([(WIDTH // 2, HEIGHT // 2)])
         self.direction = "RIGHT"
+        # Occupancy in block units, for constant-time collision and food placement
+        self.grid = SnakeGrid(WIDTH // BLOCK_SIZE, HEIGHT // BLOCK_SIZE)
+        self.grid.add(self.cell(self.body[0]))
+
+    def cell(self, pos):
+        return (pos[0] // BLOCK_SIZE, pos[1] // BLOCK_SIZE)
 
     def move(self):
         x, y = self.body[0]
@@ -30,11 +38,13 @@ class Snake:
             x -= BLOCK_SIZE
         elif self.direction == "RIGHT":
             x += BLOCK_SIZE
-        self.body.insert(0, (x, y))
-        self.body.pop()
+        self.body.appendleft((x, y))
+        self.grid.add(self.cell((x, y)))
+        self.grid.remove(self.cell(self.body.pop()))
 
     def grow(self):
         self.body.append(self.body[-1])
+        self.grid.add(self.cell(self.body[-1]))
 
     def draw(self, surface):
         for x, y in self.body:
@@ -44,22 +54,66 @@ class Snake:
         head_x, head_y = self.body[0]
         if head_x < 0 or head_x >= WIDTH or head_y < 0 or head_y >= HEIGHT:
             return True
-        if (head_x, head_y) in self.body[1:]:
+        if self.grid.count(self.cell(self.body[0])) > 1:
             return True
         return False
 
 # Food Class
 class Food:
-    def __init__(self):
-        self.x = random.randint(0, (WIDTH - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        self.y = random.randint(0, (HEIGHT - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
+    def __init__(self, snake):
+        self.snake = snake
+        self.respawn()
 
     def draw(self, surface):
         pygame.draw.rect(surface, RED, (self.x, self.y, BLOCK_SIZE, BLOCK_SIZE))
 
     def respawn(self):
-        self.x = random.randint(0, (WIDTH - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        self.y = random.randint(0, (HEIGHT - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
+        # Pick from the snake's free cells so food never lands on the body
+        cell = self.snake.grid.random_free_cell()
+        if cell is not None:
+            self.x, self.y = cell[0] * BLOCK_SIZE, cell[1] * BLOCK_SIZE
+
+# Game Class
+class Game:
+    def __init__(self):
+        self.snake = Snake()
+        self.food = Food(self.snake)
+        self.running = True
+        self.held_keys = HeldKeys()
+
+    def handle_key(self, key):
+        snake = self.snake
+        if key == pygame.K_UP and snake.direction != "DOWN":
+            snake.direction = "UP"
+        elif key == pygame.K_DOWN and snake.direction != "UP":
+            snake.direction = "DOWN"
+        elif key == pygame.K_LEFT and snake.direction != "RIGHT":
+            snake.direction = "LEFT"
+        elif key == pygame.K_RIGHT and snake.direction != "LEFT":
+            snake.direction = "RIGHT"
+
+    def update(self):
+        snake, food = self.snake, self.food
+        snake.move()
+
+        if snake.body[0][0] == food.x and snake.body[0][1] == food.y:
+            snake.grow()
+            food.respawn()
+
+        if snake.check_collision():
+            self.running = False
+
+    def step(self, inputs=()):
+        """Advance one tick with the given keys held, without drawing."""
+        self.held_keys = HeldKeys(inputs, self.held_keys)
+        for key in self.held_keys.pressed:
+            self.handle_key(key)
+        self.update()
+
+    def draw(self, surface):
+        surface.fill(BLACK)
+        self.snake.draw(surface)
+        self.food.draw(surface)
 
 # Main Game Function
 def main():
@@ -67,36 +121,17 @@ def main():
     pygame.display.set_caption("Snake Game")
     clock = pygame.time.Clock()
 
-    snake = Snake()
-    food = Food()
+    game = Game()
 
-    running = True
-    while running:
+    while game.running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                running = False
+                game.running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP and snake.direction != "DOWN":
-                    snake.direction = "UP"
-                elif event.key == pygame.K_DOWN and snake.direction != "UP":
-                    snake.direction = "DOWN"
-                elif event.key == pygame.K_LEFT and snake.direction != "RIGHT":
-                    snake.direction = "LEFT"
-                elif event.key == pygame.K_RIGHT and snake.direction != "LEFT":
-                    snake.direction = "RIGHT"
-
-        snake.move()
-
-        if snake.body[0][0] == food.x and snake.body[0][1] == food.y:
-            snake.grow()
-            food.respawn()
-
-        if snake.check_collision():
-            running = False
+                game.handle_key(event.key)
 
-        screen.fill(BLACK)
-        snake.draw(screen)
-        food.draw(screen)
+        game.update()
+        game.draw(screen)
         pygame.display.flip()
         clock.tick(FPS)
 
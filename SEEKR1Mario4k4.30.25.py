@@ -1,10 +1,26 @@
+import os
 import pygame
 import random
+import sys
+import time
+import pickle
+import hashlib
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pygame.math import Vector2
+from levelcache import LevelCache
+from textcache import TextRenderer
+from headless import HeldKeys
+from replay import Recording, replay, seek
+from snapshot import CountedRandom, SnapshotRing
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
 FPS = 60
+SIMULATION_HZ = 60  # Fixed physics rate; movement constants are per tick
+FIXED_DT = 1 / SIMULATION_HZ
+MAX_FRAME_TIME = 0.25  # Cap on simulated time per frame, so stalls don't snowball
 LEVEL_WIDTH = 4000
 WORLD_COUNT = 8
 LEVELS_PER_WORLD = 5
@@ -13,6 +29,9 @@ GRAVITY = 0.6
 JUMP_FORCE = -13
 DOUBLE_JUMP_FORCE = -10
 MAX_HEALTH = 100
+GENERATOR_VERSION = 1  # Bump whenever generated level content changes
+GRID_CELL_SIZE = 200  # Width of one spatial hash bucket in pixels
+REPLAY_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)  # Inputs a replay log records
 
 # Colors
 SKY_BLUE = (135, 206, 235)
@@ -22,49 +41,100 @@ ENEMY_RED = (255, 0, 0)
 COIN_YELLOW = (255, 215, 0)
 PLAYER_BLUE = (0, 120, 255)
 BACKGROUND_COLORS = [(175, 216, 230), (150, 200, 215), (125, 180, 200)]
+PLATFORM_COLORS = {'normal': PLATFORM_BROWN, 'bounce': (200, 150, 50), 'moving': (100, 50, 20)}
+ENEMY_COLORS = {'walker': ENEMY_RED, 'jumper': (200, 0, 0), 'shooter': (150, 0, 0)}
+
+# Packed level format: flat int arrays with fixed-width records
+PLATFORM_TYPES = ('normal', 'moving', 'bounce')
+ENEMY_TYPES = ('walker', 'jumper', 'shooter', 'dead')
+PLATFORM_FIELDS = 7  # type, x, y, w, h, direction|strength, speed
+ENEMY_FIELDS = 8  # type, x, y, w, h, direction, jump_timer, shoot_timer
+COIN_FIELDS = 5  # x, y, w, h, collected
+LEVEL_CACHE = LevelCache("seekr1", GENERATOR_VERSION, (PLATFORM_FIELDS, ENEMY_FIELDS, COIN_FIELDS))
+
+class LazyLevels:
+    """A world's level list that generates each level on first access and keeps it."""
+    def __init__(self, generator, world_num):
+        self.generator = generator
+        self.world_num = world_num
+        self._levels = {}
+        self._pending = {}
+
+    def __len__(self):
+        return LEVELS_PER_WORLD
+
+    def __getitem__(self, index):
+        if not 0 <= index < LEVELS_PER_WORLD:
+            raise IndexError(index)
+        if index not in self._levels:
+            future = self._pending.pop(index, None)
+            if future is not None:
+                self._levels[index] = future.result()
+            else:
+                self._levels[index] = self.generator.load_level(self.world_num, index + 1)
+        return self._levels[index]
+
+    def prefetch(self, index, executor):
+        # Generate a level on a background worker while the current one is played
+        if 0 <= index < LEVELS_PER_WORLD and index not in self._levels and index not in self._pending:
+            self._pending[index] = executor.submit(
+                self.generator.load_level, self.world_num, index + 1)
 
 class ProceduralGenerator:
     def __init__(self, seed=None):
-        self.seed = seed or random.randint(0, 999999)
-        random.seed(self.seed)
+        # A fresh world every launch; --seed N replays one, warm from the level cache
+        self.seed = seed if seed is not None else random.randint(0, 999999)
+        
+    def _rng(self, world_num, level_num, layer):
+        # Independent stream per (seed, world, level, layer), so any level can be built in isolation
+        return random.Random(f"{self.seed}:{world_num}:{level_num}:{layer}")
         
     def generate_world(self, world_num):
         return {
             'theme': ['ground', 'underground', 'sky', 'water'][world_num % 4],
-            'levels': [self.generate_level(world_num, lvl+1) 
-                      for lvl in range(LEVELS_PER_WORLD)]
+            'levels': LazyLevels(self, world_num)
         }
     
+    def load_level(self, world_num, level_num):
+        # Warm starts read the packed level from the on-disk cache
+        packed = LEVEL_CACHE.get_or_generate(
+            self.seed, world_num, level_num,
+            lambda: pack_level(self.generate_level(world_num, level_num)))
+        return unpack_level(packed)
+
     def generate_level(self, world_num, level_num):
         level_length = 1500 + (world_num * 300)
         return {
-            'platforms': self._generate_platforms(world_num, level_length),
-            'enemies': self._generate_enemies(world_num, level_length),
-            'collectibles': self._generate_collectibles(level_length)
+            'platforms': self._generate_platforms(
+                self._rng(world_num, level_num, 'platforms'), world_num, level_length),
+            'enemies': self._generate_enemies(
+                self._rng(world_num, level_num, 'enemies'), world_num, level_length),
+            'collectibles': self._generate_collectibles(
+                self._rng(world_num, level_num, 'collectibles'), level_length)
         }
     
-    def _generate_platforms(self, world_num, length):
+    def _generate_platforms(self, rng, world_num, length):
         platforms = []
         y = SCREEN_HEIGHT - 100
         x = 0
         
         while x < length:
-            span = random.randint(100, 200)
-            gap = random.randint(50, 100 + world_num*20)
+            span = rng.randint(100, 200)
+            gap = rng.randint(50, 100 + world_num*20)
             
-            if random.random() < 0.3:
-                y = max(200, y - random.randint(50, 150))
+            if rng.random() < 0.3:
+                y = max(200, y - rng.randint(50, 150))
             
             # Add different platform types
-            if random.random() < 0.1:
+            if rng.random() < 0.1:
                 # Moving platform
                 platforms.append({
                     'type': 'moving',
                     'rect': pygame.Rect(x, y, span, 20),
-                    'direction': random.choice([-1, 1]),
-                    'speed': random.randint(1, 3)
+                    'direction': rng.choice([-1, 1]),
+                    'speed': rng.randint(1, 3)
                 })
-            elif random.random() < 0.05:
+            elif rng.random() < 0.05:
                 # Bounce platform
                 platforms.append({
                     'type': 'bounce',
@@ -82,32 +152,140 @@ class ProceduralGenerator:
             
         return platforms
     
-    def _generate_enemies(self, world_num, length):
+    def _generate_enemies(self, rng, world_num, length):
         enemies = []
         for _ in range(5 + world_num*2):
-            x = random.randint(100, length-100)
+            x = rng.randint(100, length-100)
             y = SCREEN_HEIGHT-120
-            enemy_type = random.choice(['walker', 'jumper', 'shooter'])
+            enemy_type = rng.choice(['walker', 'jumper', 'shooter'])
             enemies.append({
                 'type': enemy_type,
                 'rect': pygame.Rect(x, y, 30, 50),
-                'direction': random.choice([-1, 1]),
+                'direction': rng.choice([-1, 1]),
                 'jump_timer': 0,
                 'shoot_timer': 0
             })
         return enemies
     
-    def _generate_collectibles(self, length):
+    def _generate_collectibles(self, rng, length):
         return [{
             'type': 'coin',
             'rect': pygame.Rect(
-                random.randint(100, length-100), 
-                random.randint(200, SCREEN_HEIGHT-200),
+                rng.randint(100, length-100), 
+                rng.randint(200, SCREEN_HEIGHT-200),
                 20, 20
             ),
             'collected': False
         } for _ in range(10)]
 
+def pack_level(level):
+    """Flatten a generated level into picklable int arrays."""
+    platforms = array('i')
+    for plat in level['platforms']:
+        kind = plat['type']
+        extra = (plat['direction'], plat['speed']) if kind == 'moving' else (plat.get('strength', 0), 0)
+        platforms.extend((PLATFORM_TYPES.index(kind), *plat['rect'], *extra))
+    enemies = array('i')
+    for enemy in level['enemies']:
+        enemies.extend((ENEMY_TYPES.index(enemy['type']), *enemy['rect'],
+                        enemy['direction'], enemy['jump_timer'], enemy['shoot_timer']))
+    coins = array('i')
+    for coin in level['collectibles']:
+        coins.extend((*coin['rect'], coin['collected']))
+    return platforms, enemies, coins
+
+def unpack_level(packed):
+    """Rebuild the runtime level dicts from pack_level output."""
+    platforms, enemies, coins = packed
+    level = {'platforms': [], 'enemies': [], 'collectibles': []}
+    for i in range(0, len(platforms), PLATFORM_FIELDS):
+        kind, x, y, w, h, a, b = platforms[i:i + PLATFORM_FIELDS]
+        plat = {'type': PLATFORM_TYPES[kind], 'rect': pygame.Rect(x, y, w, h)}
+        if plat['type'] == 'moving':
+            plat.update(direction=a, speed=b)
+        elif plat['type'] == 'bounce':
+            plat['strength'] = a
+        level['platforms'].append(plat)
+    for i in range(0, len(enemies), ENEMY_FIELDS):
+        kind, x, y, w, h, direction, jump_timer, shoot_timer = enemies[i:i + ENEMY_FIELDS]
+        level['enemies'].append({
+            'type': ENEMY_TYPES[kind],
+            'rect': pygame.Rect(x, y, w, h),
+            'direction': direction,
+            'jump_timer': jump_timer,
+            'shoot_timer': shoot_timer
+        })
+    for i in range(0, len(coins), COIN_FIELDS):
+        x, y, w, h, collected = coins[i:i + COIN_FIELDS]
+        level['collectibles'].append({
+            'type': 'coin',
+            'rect': pygame.Rect(x, y, w, h),
+            'collected': bool(collected)
+        })
+    return level
+
+def _generate_packed(job):
+    seed, world_num, level_num = job
+    return job, pack_level(ProceduralGenerator(seed).generate_level(world_num, level_num))
+
+def generate_batch(seeds, worlds=range(WORLD_COUNT), levels=range(1, LEVELS_PER_WORLD + 1),
+                   workers=None, chunksize=32):
+    """Yield ((seed, world, level), packed_level) for every job, spread over a process pool."""
+    jobs = [(seed, world_num, level_num) for seed in seeds for world_num in worlds for level_num in levels]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_generate_packed, jobs, chunksize=chunksize)
+
+class SpatialHash:
+    """Uniform grid of x-buckets over level objects that carry a 'rect'."""
+    def __init__(self, objects=(), cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.spans = {}  # id(obj) -> (first_cell, last_cell)
+        self.order = {}  # id(obj) -> insertion index, so queries keep list order
+        for obj in objects:
+            self.insert(obj)
+
+    def _span(self, rect):
+        return rect.left // self.cell_size, max(rect.left, rect.right - 1) // self.cell_size
+
+    def insert(self, obj):
+        key = id(obj)
+        self.order.setdefault(key, len(self.order))
+        first, last = self.spans[key] = self._span(obj['rect'])
+        for cell in range(first, last + 1):
+            self.cells.setdefault(cell, {})[key] = obj
+
+    def remove(self, obj):
+        first, last = self.spans.pop(id(obj))
+        for cell in range(first, last + 1):
+            del self.cells[cell][id(obj)]
+
+    def move(self, obj):
+        # Re-bucket only when the object crossed a cell boundary
+        if self._span(obj['rect']) != self.spans[id(obj)]:
+            self.remove(obj)
+            self.insert(obj)
+
+    def query(self, rect):
+        first, last = self._span(rect)
+        found = {}
+        for cell in range(first, last + 1):
+            found.update(self.cells.get(cell, {}))
+        return sorted(found.values(), key=lambda obj: self.order[id(obj)])
+
+class SortedXIndex:
+    """Static level objects sorted by left edge, for binary-searching the viewport."""
+    def __init__(self, objects):
+        self.objects = sorted(objects, key=lambda obj: obj['rect'].left)
+        self.lefts = [obj['rect'].left for obj in self.objects]
+        self.max_width = max((obj['rect'].width for obj in self.objects), default=0)
+
+    def visible(self, left, right):
+        # Anything starting more than max_width before the view cannot reach into it
+        lo = bisect_left(self.lefts, left - self.max_width)
+        hi = bisect_left(self.lefts, right)
+        return [obj for obj in self.objects[lo:hi] if obj['rect'].right > left]
+
 class Player(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
@@ -133,16 +311,23 @@ class Player(pygame.sprite.Sprite):
         # Damaged state
         self.damaged_image = pygame.Surface((30, 50))
         self.damaged_image.fill((255, 0, 0))
+        
+        # Every (state, facing_right) variant, flipped once up front
+        self.sprites = {}
+        for state, image in (('normal', self.normal_image),
+                             ('jump', self.jump_image),
+                             ('damaged', self.damaged_image)):
+            self.sprites[(state, True)] = image
+            self.sprites[(state, False)] = pygame.transform.flip(image, True, False)
 
-    def update(self, platforms, enemies, collectibles, dt):
-        self._handle_input()
-        self._update_physics(platforms, dt)
+    def update(self, keys, platforms, moving_platforms, enemies, collectibles, dt, rng):
+        self._handle_input(keys)
+        self._update_physics(platforms, moving_platforms, dt, rng)
         self._handle_enemy_collisions(enemies)
         self._handle_collectibles(collectibles)
         self._update_sprite()
 
-    def _handle_input(self):
-        keys = pygame.key.get_pressed()
+    def _handle_input(self, keys):
         self.velocity.x = 0
         if keys[pygame.K_LEFT]:
             self.velocity.x = -PLAYER_SPEED
@@ -168,13 +353,17 @@ class Player(pygame.sprite.Sprite):
         self.rect.topleft = (100, SCREEN_HEIGHT-150)
         self.health = MAX_HEALTH
 
-    def _update_physics(self, platforms, dt):
+    def _update_physics(self, platforms, moving_platforms, dt, rng):
         self.velocity.y += GRAVITY
         prev_pos = self.rect.copy()
         
+        # One broadphase query covers both passes, since only x is bucketed
+        sweep = prev_pos.union(prev_pos.move(self.velocity.x, 0))
+        nearby = platforms.query(sweep)
+        
         # Horizontal movement
         self.rect.x += self.velocity.x
-        for plat in platforms:
+        for plat in nearby:
             if not self.rect.colliderect(plat['rect']):
                 continue
             if self.velocity.x > 0:
@@ -183,9 +372,11 @@ class Player(pygame.sprite.Sprite):
                 self.rect.left = plat['rect'].right
         
         # Vertical movement
+        if self.rect.left < sweep.left or self.rect.right > sweep.right:
+            nearby = platforms.query(self.rect)
         self.rect.y += self.velocity.y
         self.on_ground = False
-        for plat in platforms:
+        for plat in nearby:
             if not self.rect.colliderect(plat['rect']):
                 continue
             
@@ -202,16 +393,16 @@ class Player(pygame.sprite.Sprite):
                 self.velocity.y = 0
         
         # Update moving platforms
-        for plat in platforms:
-            if plat['type'] == 'moving':
-                plat['rect'].x += plat['direction'] * plat['speed']
-                if random.random() < 0.01:
-                    plat['direction'] *= -1
-                if self.rect.colliderect(plat['rect']):
-                    self.rect.x += plat['direction'] * plat['speed']
+        for plat in moving_platforms:
+            plat['rect'].x += plat['direction'] * plat['speed']
+            if rng.random() < 0.01:
+                plat['direction'] *= -1
+            platforms.move(plat)
+            if self.rect.colliderect(plat['rect']):
+                self.rect.x += plat['direction'] * plat['speed']
 
     def _handle_enemy_collisions(self, enemies):
-        for enemy in enemies:
+        for enemy in enemies.query(self.rect):
             if self.rect.colliderect(enemy['rect']):
                 if self.velocity.y > 0 and self.rect.bottom <= enemy['rect'].top + 10:
                     enemy['type'] = 'dead'
@@ -221,7 +412,7 @@ class Player(pygame.sprite.Sprite):
                     self.take_damage(10)
 
     def _handle_collectibles(self, collectibles):
-        for coin in collectibles:
+        for coin in collectibles.query(self.rect):
             if not coin['collected'] and self.rect.colliderect(coin['rect']):
                 coin['collected'] = True
                 self.score += 50
@@ -229,32 +420,62 @@ class Player(pygame.sprite.Sprite):
 
     def _update_sprite(self):
         if self.health < 30:
-            self.image = self.damaged_image
+            state = 'damaged'
         elif not self.on_ground:
-            self.image = self.jump_image
+            state = 'jump'
         else:
-            self.image = self.normal_image
-            
-        if not self.facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
+            state = 'normal'
+        self.image = self.sprites[(state, self.facing_right)]
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Ultramario3 Tech Demo")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.generator = ProceduralGenerator()
+        self.hud_text = TextRenderer()
+        self.generator = ProceduralGenerator(seed)
         self.world = self.generator.generate_world(1)
         self.player = Player()
         self.current_level = None
         self.camera_x = 0
-        self.load_level(self.world['levels'][0])
+        self.held_keys = HeldKeys()
+        self.prefetcher = None  # Background level generation, only while run() plays
+        self.start_level(0)
+        
+        # Last 10 seconds of ticks, for rewinding with Backspace
+        self.history = SnapshotRing(capacity=SIMULATION_HZ * 10, keyframe_interval=SIMULATION_HZ)
+        self.ticks = 0
+        
+    def start_level(self, index):
+        self.level_index = index
+        # Runtime randomness comes from the level seed too, so a replay re-runs bit for bit
+        world_num = self.world['levels'].world_num
+        self.rng = CountedRandom(f"{self.generator.seed}:{world_num}:{index + 1}:runtime")
+        self.load_level(self.world['levels'][index])
+        if self.prefetcher is not None:
+            self.world['levels'].prefetch(index + 1, self.prefetcher)
         
     def load_level(self, level_data):
         self.current_level = level_data
         self.camera_x = 0
+        self.level_end = max((plat['rect'].right for plat in level_data['platforms']), default=0)
+        
+        # Static objects are bucketed once; moving platforms re-bucket as they go
+        self.platform_grid = SpatialHash(level_data['platforms'])
+        self.moving_platforms = [p for p in level_data['platforms'] if p['type'] == 'moving']
+        self.enemy_grid = SpatialHash(level_data['enemies'])
+        self.collectible_grid = SpatialHash(level_data['collectibles'])
+        
+        # Draw-side indices for viewport culling
+        self.static_platform_index = SortedXIndex(
+            [p for p in level_data['platforms'] if p['type'] != 'moving'])
+        self.enemy_index = SortedXIndex(level_data['enemies'])
+        self.collectible_index = SortedXIndex(level_data['collectibles'])
+        
+        # Positions at the start of the current tick, for render interpolation
+        self.prev_player_pos = self.player.rect.topleft
+        self.prev_moving_x = [plat['rect'].x for plat in self.moving_platforms]
         
     def draw_hud(self):
         health_bar_width = 200
@@ -265,8 +486,7 @@ class Game:
         pygame.draw.rect(self.screen, (0, 255, 0), (20, 20, current_health_width, 20))
         
         # Score
-        score_text = self.font.render(f"Score: {self.player.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (20, 50))
+        self.hud_text.draw_number(self.screen, "Score: ", self.player.score, 36, (255, 255, 255), (20, 50))
         
     def draw_parallax_background(self):
         for i, color in enumerate(BACKGROUND_COLORS):
@@ -276,84 +496,185 @@ class Game:
                 (-self.camera_x * (0.2 * (i+1)), 0, SCREEN_WIDTH + self.camera_x, SCREEN_HEIGHT)
             )
 
-    def run(self):
+    def draw_level(self, alpha=1.0):
+        # Only objects overlapping the viewport are drawn
+        view_left = self.camera_x
+        view_right = self.camera_x + SCREEN_WIDTH
+        
+        # Draw platforms
+        for plat in self.static_platform_index.visible(view_left, view_right):
+            pygame.draw.rect(self.screen, PLATFORM_COLORS[plat['type']], plat['rect'].move(-self.camera_x, 0))
+        for plat, prev_x in zip(self.moving_platforms, self.prev_moving_x):
+            if plat['rect'].right > view_left and plat['rect'].left < view_right:
+                x = prev_x + (plat['rect'].x - prev_x) * alpha
+                pygame.draw.rect(self.screen, PLATFORM_COLORS['moving'],
+                                 (round(x - self.camera_x), plat['rect'].y, plat['rect'].width, plat['rect'].height))
+        
+        # Draw enemies
+        for enemy in self.enemy_index.visible(view_left, view_right):
+            if enemy['type'] == 'dead':
+                continue
+            pygame.draw.rect(self.screen, ENEMY_COLORS[enemy['type']], enemy['rect'].move(-self.camera_x, 0))
+        
+        # Draw collectibles
+        for coin in self.collectible_index.visible(view_left, view_right):
+            if not coin['collected']:
+                pygame.draw.circle(
+                    self.screen,
+                    COIN_YELLOW,
+                    (coin['rect'].centerx - self.camera_x, coin['rect'].centery),
+                    coin['rect'].width // 2
+                )
+
+    def step_simulation(self, keys):
+        # Advance exactly one fixed tick
+        self.prev_player_pos = self.player.rect.topleft
+        self.prev_moving_x = [plat['rect'].x for plat in self.moving_platforms]
+        self.player.update(
+            keys,
+            self.platform_grid,
+            self.moving_platforms,
+            self.enemy_grid,
+            self.collectible_grid,
+            FIXED_DT,
+            self.rng
+        )
+
+    def tick(self, keys):
+        # One fixed tick of input and simulation, shared by play, step() and replays
+        if pygame.K_SPACE in keys.pressed:
+            self.player.jump()
+        self.step_simulation(keys)
+        # Past the last platform, move on to the next level of the world
+        if self.player.rect.left > self.level_end and self.level_index + 1 < len(self.world['levels']):
+            self.start_level(self.level_index + 1)
+            self.player.respawn()
+            self.player.velocity.update(0, 0)
+
+    def step(self, inputs=()):
+        """Advance one fixed tick with the given keys held, without drawing."""
+        self.held_keys = HeldKeys(inputs, self.held_keys)
+        self.tick(self.held_keys)
+
+    def state_digest(self):
+        """Hash of everything the simulation mutates, for checking replays."""
+        player = self.player
+        state = (
+            tuple(player.rect), tuple(player.velocity), player.on_ground, player.double_jump_available,
+            player.facing_right, player.score, player.health,
+            [(plat['rect'].x, plat['direction']) for plat in self.moving_platforms],
+            [enemy['type'] for enemy in self.current_level['enemies']],
+            [coin['collected'] for coin in self.current_level['collectibles']],
+        )
+        return hashlib.sha1(repr(state).encode()).digest()
+
+    def snapshot(self):
+        """Everything the simulation mutates, as a flat array('d') for SnapshotRing."""
+        player = self.player
+        values = array('d', (
+            self.level_index, player.rect.x, player.rect.y, player.velocity.x, player.velocity.y,
+            player.on_ground, player.double_jump_available, player.facing_right,
+            player.score, player.health, self.rng.draws))
+        for plat in self.moving_platforms:
+            values.append(plat['rect'].x)
+            values.append(plat['direction'])
+        values.extend(ENEMY_TYPES.index(enemy['type']) for enemy in self.current_level['enemies'])
+        values.extend(coin['collected'] for coin in self.current_level['collectibles'])
+        return values
+
+    def restore(self, values):
+        """Put the world back to a snapshot() taken at any earlier tick."""
+        level_index = int(values[0])
+        if level_index != self.level_index:
+            self.start_level(level_index)
+        player = self.player
+        player.rect.topleft = (int(values[1]), int(values[2]))
+        player.velocity.update(values[3], values[4])
+        player.on_ground = bool(values[5])
+        player.double_jump_available = bool(values[6])
+        player.facing_right = bool(values[7])
+        player.score = int(values[8])
+        player.health = int(values[9])
+        self.rng.seek(int(values[10]))
+        i = 11
+        for plat in self.moving_platforms:
+            plat['rect'].x = int(values[i])
+            plat['direction'] = int(values[i + 1])
+            self.platform_grid.move(plat)
+            i += 2
+        for enemy in self.current_level['enemies']:
+            enemy['type'] = ENEMY_TYPES[int(values[i])]
+            i += 1
+        for coin in self.current_level['collectibles']:
+            coin['collected'] = bool(values[i])
+            i += 1
+        player._update_sprite()
+        self.prev_player_pos = player.rect.topleft
+        self.prev_moving_x = [plat['rect'].x for plat in self.moving_platforms]
+
+    def run(self, recording=None):
         running = True
         last_time = pygame.time.get_ticks()
+        accumulator = 0.0
+        pressed = []  # KEYDOWNs not yet consumed by a tick
+        
+        # Generate the next level in the background while this one is played
+        self.prefetcher = ThreadPoolExecutor(max_workers=1)
+        self.world['levels'].prefetch(self.level_index + 1, self.prefetcher)
         
         while running:
             current_time = pygame.time.get_ticks()
-            dt = (current_time - last_time) / 1000
+            accumulator += min((current_time - last_time) / 1000, MAX_FRAME_TIME)
             last_time = current_time
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        self.player.jump()
+                    if event.key in REPLAY_KEYS:
+                        pressed.append(event.key)
                     if event.key == pygame.K_ESCAPE:
                         running = False
             
-            # Update game state
-            self.player.update(
-                self.current_level['platforms'],
-                self.current_level['enemies'],
-                self.current_level['collectibles'],
-                dt
-            )
+            # Update game state in fixed ticks, independent of frame rate
+            held = pygame.key.get_pressed()
+            while accumulator >= FIXED_DT:
+                accumulator -= FIXED_DT
+                if held[pygame.K_BACKSPACE] and len(self.history):
+                    # Step back one tick; a recording forgets the ticks undone
+                    self.ticks, values = self.history.rewind(self.ticks - 1)
+                    self.restore(values)
+                    if recording is not None:
+                        recording.truncate(self.ticks)
+                    continue
+                keys = HeldKeys([key for key in REPLAY_KEYS if held[key]], pressed=pressed)
+                pressed = []
+                if recording is not None:
+                    recording.record(keys)
+                self.history.push(self.ticks, self.snapshot())
+                self.ticks += 1
+                self.tick(keys)
+            
+            # Blend between the last two ticks for display
+            alpha = accumulator / FIXED_DT
+            prev_x, prev_y = self.prev_player_pos
+            player_x = round(prev_x + (self.player.rect.x - prev_x) * alpha)
+            player_y = round(prev_y + (self.player.rect.y - prev_y) * alpha)
             
             # Update camera
-            self.camera_x = max(0, self.player.rect.centerx - SCREEN_WIDTH//2)
+            self.camera_x = max(0, player_x + self.player.rect.width // 2 - SCREEN_WIDTH//2)
             self.camera_x = min(self.camera_x, LEVEL_WIDTH - SCREEN_WIDTH)
             
             # Draw everything
             self.screen.fill(SKY_BLUE)
             self.draw_parallax_background()
             
-            # Draw platforms
-            for plat in self.current_level['platforms']:
-                color = PLATFORM_BROWN
-                if plat['type'] == 'bounce':
-                    color = (200, 150, 50)
-                elif plat['type'] == 'moving':
-                    color = (100, 50, 20)
-                pygame.draw.rect(
-                    self.screen, 
-                    color,
-                    (plat['rect'].x - self.camera_x, plat['rect'].y, 
-                     plat['rect'].width, plat['rect'].height)
-                )
-            
-            # Draw enemies
-            for enemy in self.current_level['enemies']:
-                if enemy['type'] == 'dead':
-                    continue
-                color = ENEMY_RED
-                if enemy['type'] == 'jumper':
-                    color = (200, 0, 0)
-                elif enemy['type'] == 'shooter':
-                    color = (150, 0, 0)
-                pygame.draw.rect(
-                    self.screen,
-                    color,
-                    (enemy['rect'].x - self.camera_x, enemy['rect'].y,
-                     enemy['rect'].width, enemy['rect'].height)
-                )
-            
-            # Draw collectibles
-            for coin in self.current_level['collectibles']:
-                if not coin['collected']:
-                    pygame.draw.circle(
-                        self.screen,
-                        COIN_YELLOW,
-                        (coin['rect'].centerx - self.camera_x, coin['rect'].centery),
-                        coin['rect'].width // 2
-                    )
+            self.draw_level(alpha)
             
             # Draw player
             self.screen.blit(
                 self.player.image, 
-                (self.player.rect.x - self.camera_x, self.player.rect.y)
+                (player_x - self.camera_x, player_y)
             )
             
             # Draw HUD
@@ -361,8 +682,66 @@ class Game:
             
             pygame.display.flip()
             self.clock.tick(FPS)
+        
+        self.prefetcher.shutdown()
+        self.prefetcher = None
+
+def replay_and_seek(game, recording, target):
+    """Replay a recording while keeping one snapshot per second, then seek back to tick target.
+
+    Returns (ticks, matched, seek_matched); seek_matched says whether the state
+    after the seek hashes the same as the straight replay did at target.
+    """
+    if not 0 <= target <= recording.ticks:
+        raise ValueError(f"--seek {target} is outside the {recording.ticks}-tick recording")
+    history = SnapshotRing(capacity=recording.ticks // SIMULATION_HZ + 1, keyframe_interval=1)
+    expected = []
+
+    def indexed_tick(keys):
+        if game.ticks == target:
+            expected.append(game.state_digest())
+        if game.ticks % SIMULATION_HZ == 0:
+            history.push(game.ticks, game.snapshot())
+        game.ticks += 1
+        game.tick(keys)
+
+    ticks, matched = replay(recording, indexed_tick, game.state_digest, "seekr1")
+    if not expected:
+        expected.append(game.state_digest())  # target is the final tick
+    seek(recording, target, game.tick, history, game.restore)
+    return ticks, matched, game.state_digest() == expected[0]
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    if len(sys.argv) == 4 and sys.argv[1] == "--batch":
+        # Bulk pre-generation: --batch SEED_COUNT OUTPUT_FILE
+        with open(sys.argv[3], "wb") as out:
+            for result in generate_batch(range(1, int(sys.argv[2]) + 1)):
+                pickle.dump(result, out, pickle.HIGHEST_PROTOCOL)
+        sys.exit()
+    options = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+    if "--replay" in options:
+        # Headless re-run of a recorded session at full speed: --replay FILE [--seek TICK]
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        recording = Recording.load(options["--replay"], REPLAY_KEYS)
+        game = Game(recording.seed)
+        start = time.perf_counter()
+        seek_matched = True
+        if "--seek" in options:
+            target = int(options["--seek"])
+            ticks, matched, seek_matched = replay_and_seek(game, recording, target)
+        else:
+            ticks, matched = replay(recording, game.tick, game.state_digest, "seekr1")
+        print(f"Replayed {ticks} ticks in {time.perf_counter() - start:.2f}s: {'match' if matched else 'MISMATCH'}")
+        if "--seek" in options:
+            print(f"Seek to tick {target}: {'match' if seek_matched else 'MISMATCH'}")
+        pygame.quit()
+        sys.exit(0 if matched and seek_matched else 1)
+    # Play, optionally with --seed N and --record FILE
+    seed = int(options["--seed"]) if "--seed" in options else None
+    game = Game(seed)
+    recording = Recording("seekr1", game.generator.seed, REPLAY_KEYS) if "--record" in options else None
+    game.run(recording)
+    if recording is not None:
+        recording.digest = game.state_digest()
+        recording.save(options["--record"])
     pygame.quit()
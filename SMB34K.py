@@ -1,6 +1,9 @@
 import pygame
 import math
+from array import array
 from pygame.math import Vector2
+from headless import HeldKeys
+from snapshot import SnapshotRing
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
@@ -40,11 +43,11 @@ class AccurateSMB3_1_1:
             (1152, 160, 192)   # Second pipe
         ]
         
-        # Coins (x, y, base_y, collected)
+        # Coins [x, y, base_y, collected]
         self.coins = [
-            (408, 400, 400, False), (456, 400, 400, False),  # First platform
-            (600, 352, 352, False), (648, 352, 352, False),  # Second platform
-            (792, 304, 304, False), (840, 304, 304, False)   # Third platform
+            [408, 400, 400, False], [456, 400, 400, False],  # First platform
+            [600, 352, 352, False], [648, 352, 352, False],  # Second platform
+            [792, 304, 304, False], [840, 304, 304, False]   # Third platform
         ]
         
         # Enemies (position, direction, alive)
@@ -69,26 +72,48 @@ class AccurateSMB3_1_1:
         self.level_length = 1888  # Exact level length from original
         self.flagpole = Vector2(1792, 400)
         self.running = True
+        self.held_keys = HeldKeys()
+        
+        # Last 10 seconds of ticks, for rewinding with Backspace
+        self.history = SnapshotRing(capacity=FPS * 10, keyframe_interval=FPS)
+        self.ticks = 0
 
     def run(self):
         while self.running:
             self.handle_input()
-            self.update_physics()
-            self.update_game_state()
+            if pygame.key.get_pressed()[pygame.K_BACKSPACE] and len(self.history):
+                self.ticks, values = self.history.rewind(self.ticks - 1)
+                self.restore(values)
+            else:
+                self.history.push(self.ticks, self.snapshot())
+                self.ticks += 1
+                self.update_physics()
+                self.update_game_state()
             self.draw()
             self.clock.tick(FPS)
         pygame.quit()
 
+    def step(self, inputs=()):
+        """Advance one tick with the given keys held, without drawing."""
+        self.held_keys = HeldKeys(inputs, self.held_keys)
+        self.apply_input(self.held_keys, self.held_keys.pressed)
+        self.update_physics()
+        self.update_game_state()
+
     def handle_input(self):
+        pressed = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and self.player["on_ground"]:
-                    self.player["vel"].y = JUMP_FORCE
-                    self.player["on_ground"] = False
+                pressed.append(event.key)
+        self.apply_input(pygame.key.get_pressed(), pressed)
+
+    def apply_input(self, keys, pressed):
+        if pygame.K_SPACE in pressed and self.player["on_ground"]:
+            self.player["vel"].y = JUMP_FORCE
+            self.player["on_ground"] = False
 
-        keys = pygame.key.get_pressed()
         self.player["vel"].x = 0
         if keys[pygame.K_LEFT]:
             self.player["vel"].x = -PLAYER_SPEED
@@ -221,6 +246,42 @@ class AccurateSMB3_1_1:
             self.player["size"].y
         )
 
+    def snapshot(self):
+        """Player, camera, coins and goombas as a flat array('d') for SnapshotRing."""
+        player = self.player
+        values = array('d', (
+            player["pos"].x, player["pos"].y, player["vel"].x, player["vel"].y,
+            player["on_ground"], player["score"], player["lives"], player["invincible"],
+            player["size"].x, player["size"].y, self.camera_x, self.running))
+        for coin in self.coins:
+            values.extend(coin)
+        for goomba in self.goombas:
+            values.extend((goomba["pos"].x, goomba["pos"].y, goomba["dir"], goomba["alive"]))
+        return values
+
+    def restore(self, values):
+        """Put the level back to an earlier snapshot()."""
+        self.player.update({
+            "pos": Vector2(values[0], values[1]),
+            "vel": Vector2(values[2], values[3]),
+            "on_ground": bool(values[4]),
+            "score": int(values[5]),
+            "lives": int(values[6]),
+            "invincible": int(values[7]),
+            "size": Vector2(values[8], values[9])
+        })
+        self.camera_x = values[10]
+        self.running = bool(values[11])
+        i = 12
+        for coin in self.coins:
+            coin[:] = [int(values[i]), int(values[i + 1]), int(values[i + 2]), bool(values[i + 3])]
+            i += 4
+        for goomba in self.goombas:
+            goomba["pos"].update(values[i], values[i + 1])
+            goomba["dir"] = int(values[i + 2])
+            goomba["alive"] = bool(values[i + 3])
+            i += 4
+
     def reset_player(self):
         self.player.update({
             "pos": Vector2(64, 536),
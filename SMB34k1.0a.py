@@ -1,6 +1,7 @@
 import pygame
 import math
 from pygame.math import Vector2
+from headless import HeldKeys
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
@@ -14,6 +15,10 @@ GROUND_Y = 208
 TILE_SIZE = 16  # Standard NES tile size
 SCREEN_TILES_W = 16  # 256/16
 SCREEN_TILES_H = 15  # 240/16
+NAMETABLE_TILES_W = SCREEN_TILES_W * 2  # Two screens of columns, like the NES nametable pair
+NES_WIDTH = SCREEN_TILES_W * TILE_SIZE
+EMPTY_TILE = (0, 'ground')
+SOLID_PATTERNS = {1}  # Patterns the player can stand on
 
 # NES color palette (simplified)
 PALETTES = {
@@ -26,9 +31,21 @@ PALETTES = {
 
 class NESPPU:
     def __init__(self):
-        self.nametable = [[(0, 'ground')] * SCREEN_TILES_W for _ in range(SCREEN_TILES_H)]
+        # Ring buffer of level columns: world column x lives in slot x % NAMETABLE_TILES_W
+        self.nametable = [[EMPTY_TILE] * NAMETABLE_TILES_W for _ in range(SCREEN_TILES_H)]
+        # One byte per ring slot, 1 where the tile's pattern is solid
+        self.solid = [bytearray(NAMETABLE_TILES_W) for _ in range(SCREEN_TILES_H)]
+        self.scroll_col = None  # Leftmost world column currently loaded
+        self.scroll_x = 0
         self.pattern_table = {}
+        # Per-PPU copy, so set_palette on one PPU leaves the others alone
+        self.palettes = {name: list(colors) for name, colors in PALETTES.items()}
+        self.tile_atlas = {}
+        # Persistent background layer; only tiles in dirty_tiles get redrawn
+        self.background = pygame.Surface((NAMETABLE_TILES_W * TILE_SIZE, SCREEN_TILES_H * TILE_SIZE))
+        self.dirty_tiles = set()
         self.init_patterns()
+        self.build_atlas()
         
     def init_patterns(self):
         # Ground tile pattern
@@ -71,14 +88,95 @@ class NESPPU:
             [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
         ]
         
+    def bake_tile(self, pattern, palette):
+        # Rasterize one (pattern, palette) pair into its own tile surface
+        tile = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        colors = self.palettes[palette]
+        for y, row in enumerate(self.pattern_table[pattern]):
+            for x, color_idx in enumerate(row):
+                tile.set_at((x, y), colors[color_idx])
+        return tile
+
+    def build_atlas(self):
+        # Bake every pattern/palette combination once so rendering is blit-only
+        self.tile_atlas = {
+            (pattern, palette): self.bake_tile(pattern, palette)
+            for pattern in self.pattern_table
+            for palette in self.palettes
+        }
+        self.mark_all_dirty()
+
+    def mark_all_dirty(self):
+        self.dirty_tiles.update(
+            (x, y) for y in range(SCREEN_TILES_H) for x in range(NAMETABLE_TILES_W)
+        )
+
+    def is_loaded(self, x):
+        return self.scroll_col is not None and self.scroll_col <= x < self.scroll_col + NAMETABLE_TILES_W
+
+    def set_tile(self, x, y, pattern, palette):
+        # x is a world column; columns outside the ring are picked up when streamed in
+        if not self.is_loaded(x):
+            return
+        slot = x % NAMETABLE_TILES_W
+        if self.nametable[y][slot] != (pattern, palette):
+            self.nametable[y][slot] = (pattern, palette)
+            self.solid[y][slot] = pattern in SOLID_PATTERNS
+            self.dirty_tiles.add((slot, y))
+
+    def is_solid(self, x, y):
+        return self.is_loaded(x) and 0 <= y < SCREEN_TILES_H and self.solid[y][x % NAMETABLE_TILES_W]
+
+    def load_column(self, x, column):
+        slot = x % NAMETABLE_TILES_W
+        for y, tile in enumerate(column):
+            if self.nametable[y][slot] != tile:
+                self.nametable[y][slot] = tile
+                self.solid[y][slot] = tile[0] in SOLID_PATTERNS
+                self.dirty_tiles.add((slot, y))
+
+    def scroll_to(self, camera_x, fetch_column):
+        # Stream in only the columns that entered the window since the last call
+        first = int(camera_x) // TILE_SIZE
+        if self.scroll_col is None or abs(first - self.scroll_col) >= NAMETABLE_TILES_W:
+            new_columns = range(first, first + NAMETABLE_TILES_W)
+        elif first > self.scroll_col:
+            new_columns = range(self.scroll_col + NAMETABLE_TILES_W, first + NAMETABLE_TILES_W)
+        else:
+            new_columns = range(first, self.scroll_col)
+        self.scroll_col = first
+        self.scroll_x = int(camera_x)
+        for x in new_columns:
+            self.load_column(x, fetch_column(x))
+
+    def set_pattern(self, index, tile_data):
+        self.pattern_table[index] = tile_data
+        self.build_atlas()
+
+    def set_palette(self, name, colors):
+        self.palettes[name] = list(colors)
+        self.build_atlas()
+
     def render_tile(self, surface, tile_x, tile_y, pattern, palette):
-        tile_data = self.pattern_table[pattern]
-        for y in range(TILE_SIZE):
-            for x in range(TILE_SIZE):
-                color_idx = tile_data[y][x]
-                color = PALETTES[palette][color_idx]
-                rect = (tile_x * TILE_SIZE + x, tile_y * TILE_SIZE + y, 1, 1)
-                surface.fill(color, rect)
+        surface.blit(self.tile_atlas[(pattern, palette)], (tile_x * TILE_SIZE, tile_y * TILE_SIZE))
+
+    def update_background(self):
+        # Redraw only the tiles touched since the last frame
+        if not self.dirty_tiles:
+            return
+        self.background.blits([
+            (self.tile_atlas[self.nametable[y][x]], (x * TILE_SIZE, y * TILE_SIZE))
+            for x, y in self.dirty_tiles
+        ], doreturn=False)
+        self.dirty_tiles.clear()
+
+    def render_background(self, surface):
+        # Blit the ring with wrap-around at the current fine scroll
+        width = NAMETABLE_TILES_W * TILE_SIZE
+        offset = self.scroll_x % width
+        surface.blit(self.background, (-offset, 0))
+        if offset > width - NES_WIDTH:
+            surface.blit(self.background, (width - offset, 0))
 
 class SuperMarioBros3:
     def __init__(self):
@@ -87,6 +185,9 @@ class SuperMarioBros3:
         pygame.display.set_caption("Super Mario Bros. 3 Simulation")
         self.clock = pygame.time.Clock()
         self.ppu = NESPPU()
+        self.nes_surface = pygame.Surface((NES_WIDTH, SCREEN_TILES_H * TILE_SIZE))
+        # Level tiles by world column; only edited columns are stored
+        self.level_columns = {}
         self.init_nes_memory()
         
         # Player state
@@ -99,13 +200,15 @@ class SuperMarioBros3:
         }
         
         self.camera_x = 0
+        self.ppu.scroll_to(self.camera_x, self.level_column)
         self.running = True
+        self.held_keys = HeldKeys()
 
     def init_nes_memory(self):
         # Initialize ground
         for y in range(13, SCREEN_TILES_H):
             for x in range(SCREEN_TILES_W):
-                self.ppu.nametable[y][x] = (0, 'ground')
+                self.set_tile(x, y, 0, 'ground')
                 
         # Add platforms
         self.set_tile(4, 10, 1, 'ground')
@@ -114,8 +217,12 @@ class SuperMarioBros3:
         self.set_tile(16, 8, 1, 'ground')
 
     def set_tile(self, x, y, pattern, palette):
-        if 0 <= x < SCREEN_TILES_W and 0 <= y < SCREEN_TILES_H:
-            self.ppu.nametable[y][x] = (pattern, palette)
+        if 0 <= x and 0 <= y < SCREEN_TILES_H:
+            self.level_columns.setdefault(x, [EMPTY_TILE] * SCREEN_TILES_H)[y] = (pattern, palette)
+            self.ppu.set_tile(x, y, pattern, palette)
+
+    def level_column(self, x):
+        return self.level_columns.get(x, [EMPTY_TILE] * SCREEN_TILES_H)
 
     def run(self):
         while self.running:
@@ -126,16 +233,27 @@ class SuperMarioBros3:
             self.clock.tick(FPS)
         pygame.quit()
 
+    def step(self, inputs=()):
+        """Advance one tick with the given keys held, without rendering."""
+        self.held_keys = HeldKeys(inputs, self.held_keys)
+        self.apply_input(self.held_keys, self.held_keys.pressed)
+        self.update_physics()
+        self.update_camera()
+
     def handle_input(self):
+        pressed = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and self.player["grounded"]:
-                    self.player["vel_y"] = -JUMP_FORCE
-                    self.player["grounded"] = False
+                pressed.append(event.key)
+        self.apply_input(pygame.key.get_pressed(), pressed)
+
+    def apply_input(self, keys, pressed):
+        if pygame.K_SPACE in pressed and self.player["grounded"]:
+            self.player["vel_y"] = -JUMP_FORCE
+            self.player["grounded"] = False
         
-        keys = pygame.key.get_pressed()
         self.player["vel_x"] = PLAYER_SPEED * (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT])
         if self.player["vel_x"] > 0:
             self.player["facing_right"] = True
@@ -151,7 +269,7 @@ class SuperMarioBros3:
         self.player["y"] += self.player["vel_y"]
         
         # Keep player in bounds
-        self.player["x"] = max(0, min(self.player["x"], SCREEN_TILES_W * TILE_SIZE - self.player["width"]))
+        self.player["x"] = max(0, self.player["x"])
         
         # Ground collision
         if self.player["y"] >= GROUND_Y:
@@ -161,43 +279,35 @@ class SuperMarioBros3:
             
         # Platform collisions
         player_rect = pygame.Rect(
-            self.player["x"] - self.camera_x, 
+            self.player["x"], 
             self.player["y"], 
             self.player["width"], 
             self.player["height"]
         )
         
-        for y in range(SCREEN_TILES_H):
-            for x in range(SCREEN_TILES_W):
-                tile = self.ppu.nametable[y][x]
-                if tile[0] == 1:  # Only check platform tiles
-                    tile_rect = pygame.Rect(
-                        x * TILE_SIZE, 
-                        y * TILE_SIZE, 
-                        TILE_SIZE, 
-                        TILE_SIZE
-                    )
-                    
-                    if player_rect.colliderect(tile_rect):
-                        # Check if collision is from above
-                        if player_rect.bottom > tile_rect.top and self.player["vel_y"] > 0:
-                            self.player["y"] = tile_rect.top - self.player["height"]
-                            self.player["vel_y"] = 0
-                            self.player["grounded"] = True
+        # Only falling players can land, and the first solid tile hit wins
+        if self.player["vel_y"] <= 0:
+            return
+        
+        # Test just the tiles the player's bounding box overlaps
+        for y in range(player_rect.top // TILE_SIZE, (player_rect.bottom - 1) // TILE_SIZE + 1):
+            for x in range(player_rect.left // TILE_SIZE, (player_rect.right - 1) // TILE_SIZE + 1):
+                if self.ppu.is_solid(x, y):
+                    self.player["y"] = y * TILE_SIZE - self.player["height"]
+                    self.player["vel_y"] = 0
+                    self.player["grounded"] = True
+                    return
 
     def update_camera(self):
-        # Simple camera follows player
-        self.camera_x = max(0, self.player["x"] - SCREEN_WIDTH // 3)
+        # Simple camera follows player and streams the nametable along with it
+        self.camera_x = max(0, self.player["x"] - NES_WIDTH // 3)
+        self.ppu.scroll_to(self.camera_x, self.level_column)
 
     def render_frame(self):
-        # Create NES resolution surface
-        nes_surface = pygame.Surface((SCREEN_TILES_W * TILE_SIZE, SCREEN_TILES_H * TILE_SIZE))
-        
-        # Render background
-        for y in range(SCREEN_TILES_H):
-            for x in range(SCREEN_TILES_W):
-                pattern, palette = self.ppu.nametable[y][x]
-                self.ppu.render_tile(nes_surface, x, y, pattern, palette)
+        # Refresh changed tiles, then start the frame from the cached background
+        self.ppu.update_background()
+        nes_surface = self.nes_surface
+        self.ppu.render_background(nes_surface)
         
         # Render player (simplified)
         player_rect = pygame.Rect(
@@ -206,15 +316,14 @@ class SuperMarioBros3:
             self.player["width"], 
             self.player["height"]
         )
-        pygame.draw.rect(nes_surface, PALETTES['player'][0], player_rect)
+        pygame.draw.rect(nes_surface, self.ppu.palettes['player'][0], player_rect)
         
         # Draw eyes to show direction
         eye_x = player_rect.right - 4 if self.player["facing_right"] else player_rect.left + 4
         pygame.draw.circle(nes_surface, (255, 255, 255), (eye_x, player_rect.top + 8), 2)
         
         # Scale to window
-        scaled_surface = pygame.transform.scale(nes_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.screen.blit(scaled_surface, (0, 0))
+        pygame.transform.scale(nes_surface, (SCREEN_WIDTH, SCREEN_HEIGHT), self.screen)
         
         pygame.display.flip()
 
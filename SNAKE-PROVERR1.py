@@ -1,7 +1,10 @@
 import pygame
-import random
 import sys
-import numpy as np
+from collections import deque
+from textcache import TextRenderer
+from sfxbank import SFXBank
+from snakegrid import SnakeGrid
+from headless import HeldKeys
 
 # Initialize Pygame
 pygame.init()
@@ -22,114 +25,192 @@ RED = (255, 0, 0)
 # Set up the display
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Snake Game")
+hud_text = TextRenderer()
 
 # Initialize sound
 pygame.mixer.init(44100, -16, 1, 512)
 
+sfx_bank = SFXBank()
+
 def generate_square_wave(freq, duration=0.1):
-    sample_rate = pygame.mixer.get_init()[0]
-    period = int(sample_rate / freq)
-    amplitude = 2 ** (abs(pygame.mixer.get_init()[1]) - 1) - 1
-    tone = np.zeros((int(sample_rate * duration)), dtype=np.int16)
-    t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
-    tone = (amplitude * 0.5 * np.sign(np.sin(2 * np.pi * freq * t))).astype(np.int16)
-    sound = pygame.mixer.Sound(tone)
-    return sound
-
-eat_sound = generate_square_wave(400, 0.1)
-game_over_sound = generate_square_wave(200, 0.5)
+    return sfx_bank.square(freq, duration, volume=0.5)
 
 # Define game objects
-snake = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-snake_direction = (0, 0)
-food = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-score = 0
-
-# Set up the clock
-clock = pygame.time.Clock()
-
-# Main game loop
-running = True
-game_over = False
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if not game_over:
-                if event.key == pygame.K_UP and snake_direction != (0, 1):
-                    snake_direction = (0, -1)
-                elif event.key == pygame.K_DOWN and snake_direction != (0, -1):
-                    snake_direction = (0, 1)
-                elif event.key == pygame.K_LEFT and snake_direction != (1, 0):
-                    snake_direction = (-1, 0)
-                elif event.key == pygame.K_RIGHT and snake_direction != (-1, 0):
-                    snake_direction = (1, 0)
-            else:
-                if event.key == pygame.K_RETURN:
-                    snake = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-                    snake_direction = (0, 0)
-                    food = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-                    score = 0
-                    game_over = False
-
+occupancy = SnakeGrid(GRID_WIDTH, GRID_HEIGHT)
+
+def new_snake():
+    occupancy.clear()
+    start = (GRID_WIDTH // 2, GRID_HEIGHT // 2)
+    occupancy.add(start)
+    return deque([start])
+
+def reset():
+    global snake, snake_direction, food, score, game_over, full_redraw
+    snake = new_snake()
+    snake_direction = (0, 0)
+    food = occupancy.random_free_cell()
+    score = 0
+    game_over = False
+    full_redraw = True
+
+reset()
+held_keys = HeldKeys()
+
+def cell_rect(cell):
+    return pygame.Rect(cell[0] * CELL_SIZE, cell[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+# The grid never changes, so draw it once and blit it back under cells as they change
+grid_layer = pygame.Surface((WIDTH, HEIGHT)).convert()
+grid_layer.fill(BLACK)
+for y in range(GRID_HEIGHT):
+    for x in range(GRID_WIDTH):
+        pygame.draw.rect(grid_layer, WHITE, cell_rect((x, y)), 1)
+
+def draw_cell(cell):
+    # Food is drawn over the snake, the snake over the grid
+    rect = cell_rect(cell)
+    screen.blit(grid_layer, rect, rect)
+    if cell == food:
+        pygame.draw.rect(screen, RED, rect)
+    elif occupancy.count(cell):
+        pygame.draw.rect(screen, GREEN, rect)
+    return rect
+
+def draw_score(old_rect):
+    """Redraw the score and whatever it overlaps; returns (dirty rect, new score rect)."""
+    score_rect = pygame.Rect(10, 10, hud_text.number_width("Score: ", score, 36, WHITE),
+                             hud_text.render("Score: ", 36, WHITE).get_height())
+    region = score_rect.union(old_rect) if old_rect else score_rect
+    screen.blit(grid_layer, region, region)
+    for segment in snake:
+        if cell_rect(segment).colliderect(region):
+            pygame.draw.rect(screen, GREEN, cell_rect(segment))
+    if cell_rect(food).colliderect(region):
+        pygame.draw.rect(screen, RED, cell_rect(food))
+    hud_text.draw_number(screen, "Score: ", score, 36, WHITE, (10, 10))
+    return region, score_rect
+
+# Renderer state for the dirty-rect updates
+score_rect = None
+drawn_score = score
+
+def handle_key(key):
+    global snake_direction
     if not game_over:
-        # Move the snake
-        new_head = (snake[0][0] + snake_direction[0], snake[0][1] + snake_direction[1])
-        snake.insert(0, new_head)
-
-        # Check if the snake eats the food
-        if snake[0] == food:
-            score += 1
-            food = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            eat_sound.play()
-        else:
-            snake.pop()
-
-        # Check for collisions with walls or itself
-        if (
-            snake[0][0] < 0 or snake[0][0] >= GRID_WIDTH or
-            snake[0][1] < 0 or snake[0][1] >= GRID_HEIGHT or
-            snake[0] in snake[1:]
-        ):
+        if key == pygame.K_UP and snake_direction != (0, 1):
+            snake_direction = (0, -1)
+        elif key == pygame.K_DOWN and snake_direction != (0, -1):
+            snake_direction = (0, 1)
+        elif key == pygame.K_LEFT and snake_direction != (1, 0):
+            snake_direction = (-1, 0)
+        elif key == pygame.K_RIGHT and snake_direction != (-1, 0):
+            snake_direction = (1, 0)
+    elif key == pygame.K_RETURN:
+        reset()
+
+def update():
+    """Advance the snake one tick; returns the cells whose contents may have changed."""
+    global food, score, game_over
+    # Move the snake
+    tail = snake[-1]
+    old_food = food
+    new_head = (snake[0][0] + snake_direction[0], snake[0][1] + snake_direction[1])
+    snake.appendleft(new_head)
+    occupancy.add(new_head)
+
+    # Check if the snake eats the food
+    if snake[0] == food:
+        score += 1
+        # Food only ever spawns on an empty cell; a full board ends the game
+        spawn = occupancy.random_free_cell()
+        if spawn is None:
             game_over = True
-            game_over_sound.play()
-
-        # Draw the grid and game objects
-        screen.fill(BLACK)
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                pygame.draw.rect(screen, WHITE, rect, 1)
+        else:
+            food = spawn
+    else:
+        occupancy.remove(snake.pop())
+
+    # Check for collisions with walls or itself
+    if not game_over and (
+        not occupancy.in_bounds(snake[0]) or
+        occupancy.count(snake[0]) > 1
+    ):
+        game_over = True
+    return {new_head, tail, old_food, food}
+
+def step(inputs=()):
+    """Advance one tick with the given keys held, without drawing."""
+    global held_keys
+    held_keys = HeldKeys(inputs, held_keys)
+    for key in held_keys.pressed:
+        handle_key(key)
+    if not game_over:
+        update()
 
+def draw_frame(changed):
+    """Draw the frame; after a reset everything, otherwise only the changed cells. Returns dirty rects."""
+    global full_redraw, score_rect, drawn_score
+    if full_redraw:
+        screen.blit(grid_layer, (0, 0))
         for segment in snake:
-            x, y = segment
-            rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(screen, GREEN, rect)
+            pygame.draw.rect(screen, GREEN, cell_rect(segment))
+        pygame.draw.rect(screen, RED, cell_rect(food))
+        score_rect = draw_score(None)[1]
+        drawn_score = score
+        full_redraw = False
+        return [screen.get_rect()]
+    dirty_rects = [draw_cell(cell) for cell in changed]
+    if score != drawn_score or score_rect.collidelist(dirty_rects) != -1:
+        region, score_rect = draw_score(score_rect)
+        drawn_score = score
+        dirty_rects.append(region)
+    return dirty_rects
+
+def draw_game_over():
+    game_over_text = hud_text.render("Game Over", 74, WHITE)
+    restart_text = hud_text.render("Press Enter to Restart", 74, WHITE)
+    return [
+        screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - game_over_text.get_height() // 2)),
+        screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2 + restart_text.get_height())),
+    ]
+
+def main():
+    # Sounds play only in the windowed loop, so step() stays free of mixer calls
+    eat_sound = generate_square_wave(400, 0.1)
+    game_over_sound = generate_square_wave(200, 0.5)
+
+    # Set up the clock
+    clock = pygame.time.Clock()
+
+    # Main game loop
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                handle_key(event.key)
+
+        if not game_over:
+            last_score = score
+            dirty_rects = draw_frame(update())
+            if score > last_score:
+                eat_sound.play()
+            elif game_over:
+                game_over_sound.play()
+        else:
+            # Display game over text
+            dirty_rects = draw_game_over()
 
-        x, y = food
-        rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-        pygame.draw.rect(screen, RED, rect)
+        # Push only the changed areas to the display
+        pygame.display.update(dirty_rects)
 
-        # Display the score
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        screen.blit(score_text, (10, 10))
-    else:
-        # Display game over text
-        font = pygame.font.Font(None, 74)
-        game_over_text = font.render("Game Over", True, WHITE)
-        restart_text = font.render("Press Enter to Restart", True, WHITE)
-        screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - game_over_text.get_height() // 2))
-        screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2 + restart_text.get_height()))
-
-    # Update the display
-    pygame.display.update()
-
-    # Control the frame rate
-    clock.tick(10)
-
-# Quit Pygame properly
-pygame.quit()
-sys.exit()
+        # Control the frame rate
+        clock.tick(10)
+
+    # Quit Pygame properly
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
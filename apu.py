@@ -0,0 +1,342 @@
+import time
+import heapq
+import queue
+import threading
+import numpy as np
+import pygame
+
+CPU_CLOCK = 1789773  # NTSC 2A03
+FRAME_COUNTER_HZ = 240  # Quarter-frame clock; half-frames run at 120 Hz
+
+LENGTH_TABLE = [10, 254, 20, 2, 40, 4, 80, 6, 160, 8, 60, 10, 14, 12, 26, 14,
+                12, 16, 24, 18, 48, 20, 96, 22, 192, 24, 72, 26, 16, 28, 32, 30]
+NOISE_PERIODS = [4, 8, 16, 32, 64, 96, 128, 160, 202, 254, 380, 508, 762, 1016, 2034, 4068]
+DUTY_TABLE = np.array([
+    [0, 1, 0, 0, 0, 0, 0, 0],  # 12.5%
+    [0, 1, 1, 0, 0, 0, 0, 0],  # 25%
+    [0, 1, 1, 1, 1, 0, 0, 0],  # 50%
+    [1, 0, 0, 1, 1, 1, 1, 1],  # 75% (25% negated)
+], dtype=np.uint8)
+TRIANGLE_TABLE = np.array(list(range(15, -1, -1)) + list(range(16)), dtype=np.float64)
+
+def lfsr_sequence(length=32767, tap=1):
+    """Bit 0 of the NES noise LFSR (feedback = bit0 ^ bit<tap>) from power-on."""
+    # The bits satisfy b[n+15] = b[n] ^ b[n+tap]; squaring the feedback polynomial gives
+    # b[n + 15*2^m] = b[n] ^ b[n + tap*2^m], which extends the sequence in large blocks.
+    bits = np.zeros(length, dtype=np.uint8)
+    bits[0] = 1
+    known = 15
+    while known < length:
+        step = 1
+        while 15 * step * 2 <= known:
+            step *= 2
+        end = min(length, known + (15 - tap) * step)
+        bits[known:end] = bits[known - 15 * step:end - 15 * step] ^ bits[known - (15 - tap) * step:end - (15 - tap) * step]
+        known = end
+    return bits
+
+NOISE_LONG = lfsr_sequence(32767, tap=1)
+NOISE_SHORT = lfsr_sequence(93, tap=6)
+
+def pulse_timer(freq):
+    return max(0, min(0x7FF, round(CPU_CLOCK / (16 * freq)) - 1))
+
+def triangle_timer(freq):
+    return max(0, min(0x7FF, round(CPU_CLOCK / (32 * freq)) - 1))
+
+def length_index(half_frames):
+    """Index of the length-table entry closest to a duration in 120 Hz half-frames."""
+    return min(range(len(LENGTH_TABLE)), key=lambda i: abs(LENGTH_TABLE[i] - half_frames))
+
+class Envelope:
+    def __init__(self):
+        self.loop = False
+        self.constant = False
+        self.period = 0
+        self.start = False
+        self.divider = 0
+        self.decay = 0
+
+    def write(self, value):
+        self.loop = bool(value & 0x20)
+        self.constant = bool(value & 0x10)
+        self.period = value & 0x0F
+
+    def clock(self):
+        if self.start:
+            self.start = False
+            self.decay = 15
+            self.divider = self.period
+        elif self.divider == 0:
+            self.divider = self.period
+            if self.decay > 0:
+                self.decay -= 1
+            elif self.loop:
+                self.decay = 15
+        else:
+            self.divider -= 1
+
+    @property
+    def volume(self):
+        return self.period if self.constant else self.decay
+
+class PulseChannel:
+    def __init__(self, ones_complement):
+        self.ones_complement = ones_complement  # Pulse 1 negates with one's complement
+        self.enabled = False
+        self.duty = 0
+        self.timer = 0
+        self.length = 0
+        self.phase = 0.0
+        self.envelope = Envelope()
+        self.sweep_enabled = False
+        self.sweep_period = 0
+        self.sweep_negate = False
+        self.sweep_shift = 0
+        self.sweep_divider = 0
+        self.sweep_reload = False
+
+    def write(self, reg, value):
+        if reg == 0:
+            self.duty = value >> 6
+            self.envelope.write(value)
+        elif reg == 1:
+            self.sweep_enabled = bool(value & 0x80)
+            self.sweep_period = (value >> 4) & 0x07
+            self.sweep_negate = bool(value & 0x08)
+            self.sweep_shift = value & 0x07
+            self.sweep_reload = True
+        elif reg == 2:
+            self.timer = (self.timer & 0x700) | value
+        else:
+            self.timer = (self.timer & 0xFF) | ((value & 0x07) << 8)
+            if self.enabled:
+                self.length = LENGTH_TABLE[value >> 3]
+            self.envelope.start = True
+            self.phase = 0.0
+
+    def sweep_target(self):
+        change = self.timer >> self.sweep_shift
+        if self.sweep_negate:
+            return self.timer - change - (1 if self.ones_complement else 0)
+        return self.timer + change
+
+    def muted(self):
+        return self.timer < 8 or self.sweep_target() > 0x7FF
+
+    def clock_half_frame(self):
+        if self.sweep_divider == 0 and self.sweep_enabled and self.sweep_shift and not self.muted():
+            self.timer = max(0, self.sweep_target())
+        if self.sweep_divider == 0 or self.sweep_reload:
+            self.sweep_divider = self.sweep_period
+            self.sweep_reload = False
+        else:
+            self.sweep_divider -= 1
+        if self.length and not self.envelope.loop:
+            self.length -= 1
+
+    def render(self, count, sample_rate):
+        if not self.length or self.muted():
+            return np.zeros(count)
+        freq = CPU_CLOCK / (16 * (self.timer + 1))
+        phase = self.phase + np.arange(count) * (freq / sample_rate)
+        self.phase = (self.phase + count * freq / sample_rate) % 1.0
+        steps = (phase * 8).astype(np.int64) & 7
+        return DUTY_TABLE[self.duty][steps] * float(self.envelope.volume)
+
+class TriangleChannel:
+    def __init__(self):
+        self.enabled = False
+        self.control = False
+        self.linear_reload = 0
+        self.linear_counter = 0
+        self.reload_flag = False
+        self.timer = 0
+        self.length = 0
+        self.phase = 0.0
+
+    def write(self, reg, value):
+        if reg == 0:
+            self.control = bool(value & 0x80)
+            self.linear_reload = value & 0x7F
+        elif reg == 2:
+            self.timer = (self.timer & 0x700) | value
+        elif reg == 3:
+            self.timer = (self.timer & 0xFF) | ((value & 0x07) << 8)
+            if self.enabled:
+                self.length = LENGTH_TABLE[value >> 3]
+            self.reload_flag = True
+
+    def clock_quarter_frame(self):
+        if self.reload_flag:
+            self.linear_counter = self.linear_reload
+        elif self.linear_counter:
+            self.linear_counter -= 1
+        if not self.control:
+            self.reload_flag = False
+
+    def clock_half_frame(self):
+        if self.length and not self.control:
+            self.length -= 1
+
+    def render(self, count, sample_rate):
+        # A halted triangle holds its current level instead of dropping to 0
+        if not self.length or not self.linear_counter or self.timer < 2:
+            return np.full(count, TRIANGLE_TABLE[int(self.phase * 32) & 31])
+        freq = CPU_CLOCK / (32 * (self.timer + 1))
+        phase = self.phase + np.arange(count) * (freq / sample_rate)
+        self.phase = (self.phase + count * freq / sample_rate) % 1.0
+        return TRIANGLE_TABLE[(phase * 32).astype(np.int64) & 31]
+
+class NoiseChannel:
+    def __init__(self):
+        self.enabled = False
+        self.short_mode = False
+        self.period = 0
+        self.length = 0
+        self.position = 0.0
+        self.envelope = Envelope()
+
+    def write(self, reg, value):
+        if reg == 0:
+            self.envelope.write(value)
+        elif reg == 2:
+            self.short_mode = bool(value & 0x80)
+            self.period = value & 0x0F
+        elif reg == 3:
+            if self.enabled:
+                self.length = LENGTH_TABLE[value >> 3]
+            self.envelope.start = True
+
+    def clock_half_frame(self):
+        if self.length and not self.envelope.loop:
+            self.length -= 1
+
+    def render(self, count, sample_rate):
+        if not self.length:
+            return np.zeros(count)
+        sequence = NOISE_SHORT if self.short_mode else NOISE_LONG
+        rate = CPU_CLOCK / NOISE_PERIODS[self.period] / sample_rate
+        position = self.position + np.arange(count) * rate
+        self.position = (self.position + count * rate) % len(sequence)
+        bits = sequence[position.astype(np.int64) % len(sequence)]
+        # The channel outputs its volume while bit 0 is clear
+        return (1 - bits) * float(self.envelope.volume)
+
+class APU:
+    """2A03-style sound chip: two pulses, triangle and noise behind $4000-$4017 registers.
+
+    render() synthesizes a block of samples per channel with NumPy, runs them through
+    the NES non-linear mixer, then clocks the frame counter for the time the block
+    covered, so envelopes, sweeps and length counters advance at block granularity.
+    """
+    def __init__(self, sample_rate=44100, volume=0.5):
+        self.sample_rate = sample_rate
+        self.volume = volume
+        self.pulse1 = PulseChannel(ones_complement=True)
+        self.pulse2 = PulseChannel(ones_complement=False)
+        self.triangle = TriangleChannel()
+        self.noise = NoiseChannel()
+        self.channels = (self.pulse1, self.pulse2, self.triangle, self.noise)
+        self.quarter_frames = 0.0
+        self.quarter_count = 0
+
+    def write(self, address, value):
+        value &= 0xFF
+        if 0x4000 <= address <= 0x4003:
+            self.pulse1.write(address - 0x4000, value)
+        elif 0x4004 <= address <= 0x4007:
+            self.pulse2.write(address - 0x4004, value)
+        elif 0x4008 <= address <= 0x400B:
+            self.triangle.write(address - 0x4008, value)
+        elif 0x400C <= address <= 0x400F:
+            self.noise.write(address - 0x400C, value)
+        elif address == 0x4015:
+            for bit, channel in enumerate(self.channels):
+                channel.enabled = bool(value & (1 << bit))
+                if not channel.enabled:
+                    channel.length = 0
+
+    def clock_frame_counter(self, count):
+        self.quarter_frames += count * FRAME_COUNTER_HZ / self.sample_rate
+        while self.quarter_frames >= 1.0:
+            self.quarter_frames -= 1.0
+            self.quarter_count += 1
+            self.pulse1.envelope.clock()
+            self.pulse2.envelope.clock()
+            self.noise.envelope.clock()
+            self.triangle.clock_quarter_frame()
+            if self.quarter_count % 2 == 0:
+                for channel in self.channels:
+                    channel.clock_half_frame()
+
+    def render(self, count):
+        """Mix the next count samples into an int16 mono block."""
+        rate = self.sample_rate
+        pulse = self.pulse1.render(count, rate) + self.pulse2.render(count, rate)
+        tnd = self.triangle.render(count, rate) / 8227 + self.noise.render(count, rate) / 12241
+        with np.errstate(divide="ignore"):
+            pulse_out = np.where(pulse > 0, 95.88 / (8128 / pulse + 100), 0.0)
+            tnd_out = np.where(tnd > 0, 159.79 / (1 / tnd + 100), 0.0)
+        self.clock_frame_counter(count)
+        return ((pulse_out + tnd_out) * (32767 * self.volume)).astype(np.int16)
+
+class APUStream:
+    """Feeds APU blocks to a reserved mixer channel from a background thread.
+
+    Register writes are queued with an optional delay and applied at the start of
+    the block in which they fall due. At most one block is playing and one is
+    queued on the channel, so latency and memory are bounded by the block size.
+    """
+    def __init__(self, apu=None, block_size=512):
+        self.apu = apu or APU(pygame.mixer.get_init()[0])
+        self.block_size = block_size
+        self.block_time = block_size / self.apu.sample_rate
+        self.channels = pygame.mixer.get_init()[2]
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+        self.writes = queue.Queue()
+        self.pending = []
+        self.sequence = 0
+        self.running = False
+        self.thread = None
+
+    def write(self, address, value, delay=0.0):
+        self.writes.put((time.perf_counter() + delay, address, value))
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.channel.stop()
+
+    def apply_due_writes(self):
+        while True:
+            try:
+                due, address, value = self.writes.get_nowait()
+            except queue.Empty:
+                break
+            self.sequence += 1
+            heapq.heappush(self.pending, (due, self.sequence, address, value))
+        now = time.perf_counter()
+        while self.pending and self.pending[0][0] <= now:
+            _, _, address, value = heapq.heappop(self.pending)
+            self.apu.write(address, value)
+
+    def run(self):
+        while self.running:
+            if self.channel.get_queue() is not None:
+                time.sleep(self.block_time / 4)
+                continue
+            self.apply_due_writes()
+            block = self.apu.render(self.block_size)
+            frames = np.repeat(block[:, None], self.channels, axis=1)
+            self.channel.queue(pygame.mixer.Sound(buffer=np.ascontiguousarray(frames)))
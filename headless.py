@@ -0,0 +1,21 @@
+class HeldKeys:
+    """The keys held for one tick, indexable like pygame.key.get_pressed().
+
+    step(inputs) on each game takes any iterable of pygame key codes. pressed
+    lists the ones that were not held on the previous tick, in input order,
+    and stands in for the KEYDOWN events a window would have delivered; a
+    live loop passes the KEYDOWN keys it actually saw as pressed instead.
+    """
+    def __init__(self, keys=(), previous=None, pressed=None):
+        keys = tuple(dict.fromkeys(keys))
+        self.keys = frozenset(keys)
+        if pressed is None:
+            held = previous.keys if previous is not None else frozenset()
+            pressed = (key for key in keys if key not in held)
+        self.pressed = tuple(pressed)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+    def __contains__(self, key):
+        return key in self.keys
@@ -0,0 +1,114 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+
+# Cache location, overridable for CI boxes and kiosks
+CACHE_DIR = os.environ.get(
+    "LEVEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "levelcache"))
+
+MAGIC = b"LVC1"
+HEADER = struct.Struct("<4sI")  # magic, section count
+COUNT = struct.Struct("<I")  # records in one section
+MAX_BYTES = 64 * 1024 * 1024  # Least recently used levels are evicted past this
+
+class LevelCache:
+    """Content-addressed store of generated levels as mmap-able int32 record files.
+
+    A level is a tuple of sections, each a flat sequence of int32 values made of
+    fixed-width records. The file is a small header (magic, section count, one
+    record count per section) followed by the raw native-endian section data, so
+    loading is an mmap plus memoryview slices with no per-record parsing.
+    Every load touches the file's mtime, and a store evicts the least recently
+    used files once the directory holds more than max_bytes of levels.
+    """
+    def __init__(self, namespace, version, record_widths, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.namespace = namespace
+        self.version = version
+        self.record_widths = tuple(record_widths)
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, seed, world, level):
+        key = f"{self.namespace}:{self.version}:{self.record_widths}:{sys.byteorder}:{seed}:{world}:{level}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".lvl")
+
+    def load(self, seed, world, level):
+        """Return the cached sections as int32 memoryviews, or None on a miss."""
+        path = self.path(seed, world, level)
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        view = memoryview(data)
+        try:
+            magic, section_count = HEADER.unpack_from(view)
+            if magic != MAGIC or section_count != len(self.record_widths):
+                return None
+            offset = HEADER.size + COUNT.size * section_count
+            sections = []
+            for i, width in enumerate(self.record_widths):
+                (count,) = COUNT.unpack_from(view, HEADER.size + COUNT.size * i)
+                size = count * width * 4
+                if offset + size > len(view):
+                    return None  # Truncated file
+                sections.append(view[offset:offset + size].cast("i"))
+                offset += size
+        except struct.error:
+            return None
+        return tuple(sections)
+
+    def store(self, seed, world, level, sections):
+        # Write to a temp file and rename so readers never see a partial level
+        path = self.path(seed, world, level)
+        os.makedirs(self.directory, exist_ok=True)
+        header = HEADER.pack(MAGIC, len(sections)) + b"".join(
+            COUNT.pack(len(section) // width) for section, width in zip(sections, self.record_widths))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for section in sections:
+                f.write(memoryview(section).cast("B"))
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Delete least recently used level files until the directory fits in max_bytes."""
+        files = []
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".lvl"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # Evicted by another process meanwhile
+                total += stat.st_size
+                if entry.path != keep:
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def get_or_generate(self, seed, world, level, generate):
+        """Load a level's sections, generating and storing them on a miss."""
+        sections = self.load(seed, world, level)
+        if sections is None:
+            sections = generate()
+            try:
+                self.store(seed, world, level, sections)
+            except OSError:
+                pass  # A read-only or full disk just means no warm start next time
+        return sections
@@ -0,0 +1,111 @@
+import numpy as np
+
+# Court, paddle and ball from DSChat1.04.30.25-PongHDRV0.py
+WIDTH, HEIGHT = 800, 600
+BALL_SIZE = 20
+BALL_SPEED = 5
+PADDLE_WIDTH = 10
+PADDLE_HEIGHT = 100
+PADDLE_SPEED = 5
+PADDLE1_X = 50
+PADDLE2_X = WIDTH - 50 - PADDLE_WIDTH
+BALL_START_X = WIDTH // 2 - BALL_SIZE // 2
+BALL_START_Y = HEIGHT // 2 - BALL_SIZE // 2
+PADDLE_START_Y = HEIGHT // 2 - PADDLE_HEIGHT // 2
+
+# Per-paddle action bits, the W/S (or UP/DOWN) keys held this tick
+UP, DOWN = 1, 2
+
+class BatchedPong:
+    """N Pong matches stepped together as NumPy struct-of-arrays state.
+
+    Positions are integer rect corners, matching the pygame.Rect moves,
+    strict-overlap paddle tests, wall bounces (vy flips on every tick the ball
+    touches or overlaps a wall, not just the first) and reset_ball serves of
+    the pygame game. A match ends when either side reaches
+    max_score and is reset in place, gym style.
+    """
+    def __init__(self, num_matches, max_score=11, seed=None):
+        self.num_matches = num_matches
+        self.max_score = max_score
+        self.rng = np.random.default_rng(seed)
+        self.ball_x = np.zeros(num_matches, dtype=np.int32)
+        self.ball_y = np.zeros(num_matches, dtype=np.int32)
+        self.ball_vx = np.zeros(num_matches, dtype=np.int32)
+        self.ball_vy = np.zeros(num_matches, dtype=np.int32)
+        self.paddle1_y = np.zeros(num_matches, dtype=np.int32)
+        self.paddle2_y = np.zeros(num_matches, dtype=np.int32)
+        self.score1 = np.zeros(num_matches, dtype=np.int32)
+        self.score2 = np.zeros(num_matches, dtype=np.int32)
+        self.reset()
+
+    def observation(self):
+        """(N, 6) float32 rows of ball x, y, vx, vy and both paddle tops."""
+        return np.stack([self.ball_x, self.ball_y, self.ball_vx, self.ball_vy,
+                         self.paddle1_y, self.paddle2_y], axis=1).astype(np.float32)
+
+    def reset(self, mask=None):
+        """Start fresh matches everywhere, or on the matches selected by mask."""
+        if mask is None:
+            mask = np.ones(self.num_matches, dtype=bool)
+        self.paddle1_y[mask] = PADDLE_START_Y
+        self.paddle2_y[mask] = PADDLE_START_Y
+        self.score1[mask] = 0
+        self.score2[mask] = 0
+        self.reset_ball(mask)
+        return self.observation()
+
+    def reset_ball(self, mask):
+        count = int(np.count_nonzero(mask))
+        self.ball_x[mask] = BALL_START_X
+        self.ball_y[mask] = BALL_START_Y
+        self.ball_vx[mask] = BALL_SPEED * (self.rng.integers(0, 2, count) * 2 - 1)
+        self.ball_vy[mask] = BALL_SPEED * (self.rng.integers(0, 2, count) * 2 - 1)
+
+    def move_paddle(self, y, action):
+        y = np.where((action & UP != 0) & (y > 0), y - PADDLE_SPEED, y)
+        return np.where((action & DOWN != 0) & (y + PADDLE_HEIGHT < HEIGHT), y + PADDLE_SPEED, y)
+
+    def hits_paddle(self, paddle_x, paddle_y):
+        return ((self.ball_x < paddle_x + PADDLE_WIDTH) & (self.ball_x + BALL_SIZE > paddle_x) &
+                (self.ball_y < paddle_y + PADDLE_HEIGHT) & (self.ball_y + BALL_SIZE > paddle_y))
+
+    def step(self, actions):
+        """Advance every match one tick; returns (observation, reward, done, info).
+
+        actions is (N, 2): UP/DOWN bits for the left and right paddle. reward is
+        (N, 2) with +1 for the side that scored and -1 for the other. done
+        matches have already been reset, and info["score"] holds the (N, 2)
+        scores before the reset.
+        """
+        actions = np.asarray(actions, dtype=np.int32)
+        self.paddle1_y = self.move_paddle(self.paddle1_y, actions[:, 0])
+        self.paddle2_y = self.move_paddle(self.paddle2_y, actions[:, 1])
+
+        self.ball_x += self.ball_vx
+        self.ball_y += self.ball_vy
+
+        # Wall and paddle bounces only flip the velocity, as in the pygame game
+        wall = (self.ball_y <= 0) | (self.ball_y + BALL_SIZE >= HEIGHT)
+        self.ball_vy = np.where(wall, -self.ball_vy, self.ball_vy)
+        hit1 = self.hits_paddle(PADDLE1_X, self.paddle1_y) & (self.ball_vx < 0)
+        hit2 = ~hit1 & self.hits_paddle(PADDLE2_X, self.paddle2_y) & (self.ball_vx > 0)
+        self.ball_vx = np.where(hit1 | hit2, -self.ball_vx, self.ball_vx)
+
+        # A served ball starts mid-court, so at most one side scores per tick
+        point2 = self.ball_x <= 0
+        point1 = ~point2 & (self.ball_x + BALL_SIZE >= WIDTH)
+        self.score1 += point1
+        self.score2 += point2
+        scored = point1 | point2
+        if scored.any():
+            self.reset_ball(scored)
+
+        reward = np.zeros((self.num_matches, 2), dtype=np.float32)
+        reward[:, 0] = point1.astype(np.float32) - point2
+        reward[:, 1] = -reward[:, 0]
+        done = (self.score1 >= self.max_score) | (self.score2 >= self.max_score)
+        info = {"score": np.stack([self.score1, self.score2], axis=1)}
+        if done.any():
+            self.reset(done)
+        return self.observation(), reward, done, info
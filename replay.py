@@ -0,0 +1,122 @@
+import os
+import struct
+from headless import HeldKeys
+
+MAGIC = b"RPL1"
+HEADER = struct.Struct("<4s16sqII")  # magic, game, seed, ticks, run count
+RUN = struct.Struct("<HH")  # input mask, ticks it was held for
+MAX_RUN = 0xFFFF
+
+def encode_keys(keys, key_order):
+    """Pack a tick's HeldKeys into a mask: held keys in the low byte, new presses in the high byte."""
+    mask = 0
+    for bit, key in enumerate(key_order):
+        if keys[key]:
+            mask |= 1 << bit
+        if key in keys.pressed:
+            mask |= 0x100 << bit
+    return mask
+
+def decode_keys(mask, key_order):
+    held = [key for bit, key in enumerate(key_order) if mask & (1 << bit)]
+    pressed = [key for bit, key in enumerate(key_order) if mask & (0x100 << bit)]
+    return HeldKeys(held, pressed=pressed)
+
+class Recording:
+    """A game's seed plus the per-tick input masks of one session, run-length encoded.
+
+    Inputs rarely change from one tick to the next, so a session is a short
+    list of (mask, count) runs; a ten-minute game is typically a few KB. The
+    file ends with a digest of the final game state, which replay() checks
+    to confirm the re-run matched bit for bit.
+    """
+    def __init__(self, game, seed, key_order, runs=None, digest=b""):
+        self.game = game
+        self.seed = seed
+        self.key_order = tuple(key_order)
+        self.runs = runs if runs is not None else []
+        self.digest = digest
+
+    @property
+    def ticks(self):
+        return sum(count for _, count in self.runs)
+
+    def record(self, keys):
+        """Append one tick's HeldKeys and return its mask."""
+        mask = encode_keys(keys, self.key_order)
+        if self.runs and self.runs[-1][0] == mask and self.runs[-1][1] < MAX_RUN:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([mask, 1])
+        return mask
+
+    def inputs(self, start=0):
+        """Yield a HeldKeys per recorded tick, from tick start on."""
+        for mask, count in self.runs:
+            if start >= count:
+                start -= count
+                continue
+            keys = decode_keys(mask, self.key_order)
+            for _ in range(count - start):
+                yield keys
+            start = 0
+
+    def truncate(self, ticks):
+        """Forget every tick from ticks on, e.g. after the player rewinds."""
+        excess = self.ticks - ticks
+        while excess > 0 and self.runs:
+            if self.runs[-1][1] > excess:
+                self.runs[-1][1] -= excess
+                break
+            excess -= self.runs.pop()[1]
+
+    def save(self, path):
+        # Write to a temp file and rename so a crash never leaves a partial log
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.game.encode(), self.seed, self.ticks, len(self.runs)))
+            f.write(b"".join(RUN.pack(mask, count) for mask, count in self.runs))
+            f.write(self.digest)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, key_order):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, game, seed, ticks, run_count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        offset = HEADER.size
+        runs = [list(RUN.unpack_from(data, offset + i * RUN.size)) for i in range(run_count)]
+        digest = data[offset + run_count * RUN.size:]
+        return cls(game.rstrip(b"\0").decode(), seed, key_order, runs, digest)
+
+def seek(recording, target, tick, history, restore):
+    """Bring a game to recording tick target from the nearest snapshot in history.
+
+    history is a SnapshotRing filled with snapshots keyed by recording tick;
+    with none at or before target, the game must be freshly started.
+    """
+    start = 0
+    entry = history.latest(target)
+    if entry is not None:
+        start, values = entry
+        restore(values)
+    inputs = recording.inputs(start)
+    for _ in range(target - start):
+        tick(next(inputs))
+
+def replay(recording, tick, digest, game=None):
+    """Re-run a recording through tick(keys) as fast as possible.
+
+    tick returns False once the game has ended. Returns (ticks run, whether
+    the final state digest matches the one recorded).
+    """
+    if game is not None and recording.game != game:
+        raise ValueError(f"replay was recorded for {recording.game}, not {game}")
+    ticks = 0
+    for keys in recording.inputs():
+        ticks += 1
+        if tick(keys) is False:
+            break
+    return ticks, digest() == recording.digest
@@ -0,0 +1,88 @@
+import os
+import sys
+import mmap
+import hashlib
+import numpy as np
+import pygame
+
+# Cache location, overridable for CI boxes and kiosks
+CACHE_DIR = os.environ.get(
+    "SFX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sfxbank"))
+
+BANK_VERSION = 2
+
+def square_samples(freqs, duration, duty=0.5, volume=0.2):
+    """Duty-cycle square waves at the mixer rate, one int16 row per frequency."""
+    sample_rate = pygame.mixer.get_init()[0]
+    samples = int(sample_rate * duration)
+    period = sample_rate / np.atleast_1d(np.asarray(freqs, dtype=np.float64))[:, None]
+    high = (np.arange(samples) % period) < np.floor(period * duty)
+    level = int(32767 * volume)
+    return np.where(high, level, -level).astype(np.int16)
+
+def mixer_frames(mono):
+    # Copy the mono wave into every mixer channel (interleaved int16 frames)
+    channels = pygame.mixer.get_init()[2]
+    return np.ascontiguousarray(np.repeat(mono[:, None], channels, axis=1))
+
+def square_key(freq, duration, duty=0.5, volume=0.2):
+    return ("square", freq, duration, duty, volume, pygame.mixer.get_init()[2])
+
+class SFXBank:
+    """On-disk cache of synthesized sound effects as raw PCM files.
+
+    A buffer is addressed by its synthesis parameters plus the mixer format
+    (rate, sample size, channels), so every game sharing the directory reuses
+    the same tones. Files hold nothing but the mixer-ready frames, so a warm
+    load is an mmap handed straight to pygame.mixer.Sound(buffer=...).
+    """
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        frequency, size, channels = pygame.mixer.get_init()
+        name = f"{BANK_VERSION}:{frequency}:{size}:{channels}:{sys.byteorder}:{key!r}"
+        return os.path.join(self.directory, hashlib.sha1(name.encode()).hexdigest() + ".pcm")
+
+    def frame_size(self):
+        _, size, channels = pygame.mixer.get_init()
+        return abs(size) // 8 * channels
+
+    def load(self, key):
+        """Return the cached PCM as a read-only buffer, or None on a miss."""
+        try:
+            with open(self.path(key), "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None  # Missing or empty file
+        if len(data) % self.frame_size():
+            return None  # Truncated file
+        return data
+
+    def store(self, key, pcm):
+        # Write to a temp file and rename so readers never see a partial buffer
+        path = self.path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(memoryview(pcm).cast("B"))
+        os.replace(tmp_path, path)
+
+    def get_or_synthesize(self, key, synthesize):
+        """Load a buffer, synthesizing and storing it on a miss."""
+        pcm = self.load(key)
+        if pcm is None:
+            pcm = synthesize()
+            try:
+                self.store(key, pcm)
+            except OSError:
+                pass  # A read-only or full disk just means synthesizing again next launch
+        return pcm
+
+    def sound(self, key, synthesize):
+        return pygame.mixer.Sound(buffer=self.get_or_synthesize(key, synthesize))
+
+    def square(self, freq, duration, duty=0.5, volume=0.2):
+        """A square-wave Sound, shared by every game that asks for the same tone."""
+        return self.sound(square_key(freq, duration, duty, volume),
+                          lambda: mixer_frames(square_samples(freq, duration, duty, volume)[0]))
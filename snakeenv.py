@@ -0,0 +1,131 @@
+import numpy as np
+
+# Board size and rules from SNAKE-PROVERR1.py
+GRID_WIDTH = 800 // 20
+GRID_HEIGHT = 600 // 20
+CELLS = GRID_WIDTH * GRID_HEIGHT
+
+# Actions mirror the arrow keys; NOOP keeps the current direction
+NOOP, UP, DOWN, LEFT, RIGHT = range(5)
+ACTION_DX = np.array([0, 0, 0, -1, 1], dtype=np.int32)
+ACTION_DY = np.array([0, -1, 1, 0, 0], dtype=np.int32)
+
+# Observation cell codes
+EMPTY, BODY, HEAD, FOOD = range(4)
+
+class BatchedSnake:
+    """N Snake boards stepped together as NumPy arrays.
+
+    Each board keeps its body as a ring buffer of cell indices (head_ptr,
+    length), an occupancy/observation grid of EMPTY/BODY/HEAD/FOOD codes, the
+    head position and direction, and its food cell. step(actions) applies the
+    same tick as the pygame game: turn unless reversing, push the head, eat or
+    pop the tail, then die on a wall or the body. Finished boards reset in
+    place, and the observation is the live (N, height, width) grid, not a copy.
+    """
+    def __init__(self, num_boards, seed=None):
+        self.num_boards = num_boards
+        self.rng = np.random.default_rng(seed)
+        self.index = np.arange(num_boards)
+        self.board = np.zeros((num_boards, CELLS), dtype=np.uint8)
+        self.body = np.zeros((num_boards, CELLS), dtype=np.int32)
+        self.head_ptr = np.zeros(num_boards, dtype=np.int32)
+        self.length = np.zeros(num_boards, dtype=np.int32)
+        self.head_x = np.zeros(num_boards, dtype=np.int32)
+        self.head_y = np.zeros(num_boards, dtype=np.int32)
+        self.dx = np.zeros(num_boards, dtype=np.int32)
+        self.dy = np.zeros(num_boards, dtype=np.int32)
+        self.food = np.zeros(num_boards, dtype=np.int32)
+        self.score = np.zeros(num_boards, dtype=np.int32)
+        self.reset()
+
+    @property
+    def observation(self):
+        return self.board.reshape(self.num_boards, GRID_HEIGHT, GRID_WIDTH)
+
+    def reset(self, mask=None):
+        """Start a fresh game on every board, or on the boards selected by mask."""
+        boards = self.index if mask is None else self.index[mask]
+        start_x, start_y = GRID_WIDTH // 2, GRID_HEIGHT // 2
+        start = start_y * GRID_WIDTH + start_x
+        self.board[boards] = EMPTY
+        self.board[boards, start] = HEAD
+        self.body[boards, 0] = start
+        self.head_ptr[boards] = 0
+        self.length[boards] = 1
+        self.head_x[boards] = start_x
+        self.head_y[boards] = start_y
+        self.dx[boards] = 0
+        self.dy[boards] = 0
+        self.score[boards] = 0
+        self.spawn_food(boards)
+        return self.observation
+
+    def spawn_food(self, boards):
+        """Place food on a uniformly chosen empty cell; returns the boards with none left."""
+        if not len(boards):
+            return boards
+        free = self.board[boards] == EMPTY
+        counts = free.sum(axis=1)
+        full = counts == 0
+        # Index of the k-th free cell on each board, k uniform in [0, free count)
+        k = (self.rng.random(len(boards)) * np.maximum(counts, 1)).astype(np.int32)
+        cells = (np.cumsum(free, axis=1) > k[:, None]).argmax(axis=1)
+        placed = boards[~full]
+        self.food[placed] = cells[~full]
+        self.board[placed, cells[~full]] = FOOD
+        return boards[full]
+
+    def step(self, actions):
+        """Advance every board one tick; returns (observation, reward, done, info).
+
+        reward is the score gained this tick. done boards have already been
+        reset, and info["score"] holds each board's score before the reset.
+        """
+        index = self.index
+        actions = np.asarray(actions, dtype=np.int32)
+
+        # Turn, unless the key would reverse the snake onto itself
+        want_dx = ACTION_DX[actions]
+        want_dy = ACTION_DY[actions]
+        turn = (actions != NOOP) & ~((want_dx == -self.dx) & (want_dy == -self.dy))
+        self.dx = np.where(turn, want_dx, self.dx)
+        self.dy = np.where(turn, want_dy, self.dy)
+
+        # Move the head, remembering which moves leave the board
+        new_x = self.head_x + self.dx
+        new_y = self.head_y + self.dy
+        off_board = (new_x < 0) | (new_x >= GRID_WIDTH) | (new_y < 0) | (new_y >= GRID_HEIGHT)
+        new_head = np.where(off_board, 0, new_y * GRID_WIDTH + new_x)
+        old_head = self.body[index, self.head_ptr]
+        eat = ~off_board & (new_head == self.food)
+
+        # The old head becomes body, then snakes that didn't eat free their tail
+        self.board[index, old_head] = BODY
+        pop = ~eat
+        tail = self.body[index, (self.head_ptr - self.length + 1) % CELLS]
+        self.board[index[pop], tail[pop]] = EMPTY
+        self.length += eat
+
+        # Running into the body (but not the cell the tail just left) ends the game
+        hit = ~off_board & (self.board[index, new_head] == BODY)
+        self.head_ptr = (self.head_ptr + 1) % CELLS
+        self.body[index, self.head_ptr] = new_head
+        alive = ~(off_board | hit)
+        self.board[index[alive], new_head[alive]] = HEAD
+        self.head_x, self.head_y = new_x, new_y
+
+        # Eaters get new food; a board with no empty cell left is finished
+        self.score += eat
+        done = ~alive
+        done[self.spawn_food(index[eat & alive])] = True
+
+        info = {"score": self.score.copy()}
+        if done.any():
+            self.reset(done)
+        return self.observation, eat.astype(np.float32), done, info
+
+    def planes(self):
+        """One-hot (N, 3, height, width) float32 body/head/food planes of the observation."""
+        grid = self.observation
+        return np.stack([grid == BODY, grid == HEAD, grid == FOOD], axis=1).astype(np.float32)
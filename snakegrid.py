@@ -0,0 +1,56 @@
+import random
+
+class SnakeGrid:
+    """Cell occupancy for a snake on a width x height board.
+
+    counts holds how many segments cover each cell (a freshly grown tail
+    overlaps the segment before it), so self-collision is one lookup. Every
+    uncovered cell lives in a swap-remove array, free, with slot giving each
+    cell's position in it, so food placement is a single random pick that can
+    never land on the body. Cells off the board are ignored.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.clear()
+
+    def clear(self):
+        size = self.width * self.height
+        self.counts = bytearray(size)
+        self.free = list(range(size))
+        self.slot = list(range(size))
+
+    def in_bounds(self, cell):
+        return 0 <= cell[0] < self.width and 0 <= cell[1] < self.height
+
+    def add(self, cell):
+        if not self.in_bounds(cell):
+            return
+        index = cell[1] * self.width + cell[0]
+        if self.counts[index] == 0:
+            # Swap-remove from the free array
+            slot = self.slot[index]
+            last = self.free.pop()
+            if last != index:
+                self.free[slot] = last
+                self.slot[last] = slot
+        self.counts[index] += 1
+
+    def remove(self, cell):
+        if not self.in_bounds(cell):
+            return
+        index = cell[1] * self.width + cell[0]
+        self.counts[index] -= 1
+        if self.counts[index] == 0:
+            self.slot[index] = len(self.free)
+            self.free.append(index)
+
+    def count(self, cell):
+        return self.counts[cell[1] * self.width + cell[0]] if self.in_bounds(cell) else 0
+
+    def random_free_cell(self, rng=random):
+        """A uniformly chosen empty cell, or None when the snake fills the board."""
+        if not self.free:
+            return None
+        index = self.free[rng.randrange(len(self.free))]
+        return (index % self.width, index // self.width)
@@ -0,0 +1,96 @@
+import random
+from array import array
+from collections import deque
+
+class CountedRandom:
+    """A seeded random() stream whose whole state is the number of draws made.
+
+    Draws come from a fresh random.Random per block of BLOCK draws, seeded from
+    (seed, block number), so seek(draws) re-seeds one block and discards at most
+    BLOCK - 1 values. A snapshot stores one counter instead of a 625-word
+    Mersenne Twister state that differs from the keyframe on nearly every tick.
+    """
+    BLOCK = 64
+
+    def __init__(self, seed, draws=0):
+        self.seed = seed
+        self.seek(draws)
+
+    def seek(self, draws):
+        """Continue the stream from draw number draws."""
+        self.draws = draws
+        self._block = random.Random(f"{self.seed}:{draws // self.BLOCK}")
+        for _ in range(draws % self.BLOCK):
+            self._block.random()
+
+    def random(self):
+        value = self._block.random()
+        self.draws += 1
+        if self.draws % self.BLOCK == 0:
+            self._block = random.Random(f"{self.seed}:{self.draws // self.BLOCK}")
+        return value
+
+class SnapshotRing:
+    """Bounded history of game snapshots for rewind and seeking.
+
+    A snapshot is a flat array('d') of every value the simulation mutates.
+    Every keyframe_interval-th push is stored whole; the rest keep only the
+    (index, value) pairs that differ from the latest keyframe, so restoring
+    any tick is one keyframe copy plus one sparse patch. The oldest entries
+    fall off once capacity is reached, and a keyframe stays alive as long as
+    a delta still refers to it.
+    """
+    def __init__(self, capacity=600, keyframe_interval=60):
+        self.entries = deque(maxlen=capacity)  # (tick, keyframe, indices, values)
+        self.keyframe_interval = keyframe_interval
+        self.keyframe = None
+        self.since_keyframe = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, tick, values):
+        keyframe = self.keyframe
+        if (keyframe is None or self.since_keyframe >= self.keyframe_interval
+                or len(keyframe) != len(values)):
+            # Full snapshot; also forced when the layout changes (e.g. a new level)
+            self.keyframe = array('d', values)
+            self.since_keyframe = 1
+            self.entries.append((tick, self.keyframe, None, None))
+            return
+        indices = array('I')
+        changed = array('d')
+        for i, (old, new) in enumerate(zip(keyframe, values)):
+            # NaN != NaN, so a NaN that stays NaN is not a change
+            if old != new and (old == old or new == new):
+                indices.append(i)
+                changed.append(new)
+        self.since_keyframe += 1
+        self.entries.append((tick, keyframe, indices, changed))
+
+    def decode(self, entry):
+        tick, keyframe, indices, changed = entry
+        values = array('d', keyframe)
+        if indices is not None:
+            for i, value in zip(indices, changed):
+                values[i] = value
+        return tick, values
+
+    def latest(self, tick=None):
+        """(tick, values) of the newest snapshot at or before tick, or None."""
+        for entry in reversed(self.entries):
+            if tick is None or entry[0] <= tick:
+                return self.decode(entry)
+        return None
+
+    def rewind(self, tick):
+        """Pop back to the newest snapshot at or before tick, dropping it and everything after.
+
+        Returns its (tick, values), or None when the history doesn't reach back that far;
+        the caller restores it and carries on pushing from that tick.
+        """
+        while self.entries and self.entries[-1][0] > tick:
+            self.entries.pop()
+        # Deltas pushed from here on must not refer to a keyframe that was dropped
+        self.keyframe = None
+        return self.decode(self.entries.pop()) if self.entries else None
@@ -0,0 +1,65 @@
+import pygame
+from collections import OrderedDict
+
+class TextRenderer:
+    """HUD text renderer shared by the games.
+
+    Each font size is loaded once. Rendered strings are kept in an LRU cache
+    keyed by (text, size, color), and numbers are composed from a per-(size,
+    color) digit glyph atlas so a ticking score or timer never re-rasterizes.
+    """
+    def __init__(self, font_name=None, max_entries=256, antialias=True):
+        self.font_name = font_name
+        self.max_entries = max_entries
+        self.antialias = antialias
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.digit_atlases = {}
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(self.font_name, size)
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = self.surfaces[key] = self.font(size).render(text, self.antialias, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def digits(self, size, color):
+        key = (size, tuple(color))
+        atlas = self.digit_atlases.get(key)
+        if atlas is None:
+            font = self.font(size)
+            atlas = self.digit_atlases[key] = {
+                ch: font.render(ch, self.antialias, color) for ch in "0123456789-"}
+        return atlas
+
+    def draw(self, surface, text, size, color, pos):
+        surface.blit(self.render(text, size, color), pos)
+
+    def draw_number(self, surface, label, value, size, color, pos):
+        """Blit a cached label followed by value built from digit glyphs; returns the end x."""
+        x, y = pos
+        if label:
+            label_surface = self.render(label, size, color)
+            surface.blit(label_surface, (x, y))
+            x += label_surface.get_width()
+        atlas = self.digits(size, color)
+        for ch in str(int(value)):
+            glyph = atlas[ch]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+    def number_width(self, label, value, size, color):
+        width = self.render(label, size, color).get_width() if label else 0
+        atlas = self.digits(size, color)
+        return width + sum(atlas[ch].get_width() for ch in str(int(value)))